@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""Compare the HTML parser backends on Realethio and EthiopiaRealty listing pages.
+
+Prints cards parsed per second for every installed backend and checks that all
+backends extract identical records.
+
+    python bench_parsers.py                         # synthetic pages
+    python bench_parsers.py --realethio page.html   # a saved listing page
+"""
+
+import argparse
+import time
+
+from scrapers import HTML_PARSERS, SITE_DEFINITIONS, get_html_parser
+
+REALETHIO_CARD = """
+<div class="item-listing-wrap hz-item-gallery-js card">
+  <div class="item-body flex-grow-1">
+    <h2 class="item-title"><a href="https://realethio.com/property/house-{i}/">G+1 House for sale in Bole {i}</a></h2>
+    <ul class="item-price-wrap"><li class="item-price">ETB {price}</li></ul>
+    <address class="item-address">Bole, Addis Ababa</address>
+    <ul class="item-amenities"><li class="h-beds">4 Bedrooms</li><li class="h-area">{size} m²</li></ul>
+  </div>
+</div>"""
+
+ETHIOPIAREALTY_CARD = """
+<div class="d-flex align-items-center h-100">
+  <div class="item-body">
+    <h2 class="item-title"><a href="https://ethiopiarealty.com/property/building-{i}/">Building for sale {i}</a></h2>
+    <ul class="item-price-wrap"><li class="item-price">{price} ETB</li></ul>
+    <address class="item-address">Ayat , Addis Ababa</address>
+    <ul class="item-amenities"><li><span class="hz-figure">{size}</span> m²</li></ul>
+  </div>
+</div>"""
+
+def synthetic_page(card, cards):
+    body = "".join(card.format(i=i, price=f"{(i + 1) * 125000:,}", size=150 + i) for i in range(cards))
+    return f"<html><head><meta charset='utf-8'></head><body>{body}</body></html>".encode("utf-8")
+
+def bench(parse_page, content, repeat):
+    results = {}
+    for name in HTML_PARSERS:
+        parser = get_html_parser(name)
+        records = parse_page(content, parser)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            parse_page(content, parser)
+        elapsed = time.perf_counter() - start
+        results[name] = (records, len(records) * repeat / elapsed if elapsed else float("inf"))
+    return results
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--cards", type=int, default=40, help="cards per synthetic page")
+    arg_parser.add_argument("--repeat", type=int, default=50, help="parses per backend")
+    arg_parser.add_argument("--realethio", help="saved Realethio listing page")
+    arg_parser.add_argument("--ethiopiarealty", help="saved EthiopiaRealty listing page")
+    args = arg_parser.parse_args()
+
+    pages = [
+        ("Realethio", SITE_DEFINITIONS["realethio"].parse_page, args.realethio, REALETHIO_CARD),
+        ("EthiopiaRealty", SITE_DEFINITIONS["ethiopiarealty"].parse_page, args.ethiopiarealty, ETHIOPIAREALTY_CARD)
+    ]
+    for site, parse_page, path, card in pages:
+        if path:
+            with open(path, "rb") as f:
+                content = f.read()
+        else:
+            content = synthetic_page(card, args.cards)
+
+        results = bench(parse_page, content, args.repeat)
+        baseline = results["bs4"][0]
+        print(f"{site}:")
+        for name, (records, rate) in results.items():
+            same = "identical" if records.equals(baseline) else "DIFFERENT from bs4"
+            print(f"  {name:<6} {rate:>10,.0f} cards/s  ({len(records)} cards, {same})")
+
+if __name__ == "__main__":
+    main()
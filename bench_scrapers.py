@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""Offline benchmarks: parse throughput, end-to-end scraping and table population.
+
+Listing pages come from the fixtures in bench_fixtures/, served by a stub HTTP server on
+127.0.0.1 in place of every site, so runs never touch the live sites. Each run is appended
+to the results file as one JSON line, so runs can be compared over time.
+
+    python bench_scrapers.py                        # everything, appended to bench_results.jsonl
+    python bench_scrapers.py --pages 50 --no-gui    # skip the table population benchmark
+    python bench_scrapers.py --record               # refresh the fixtures from the live sites
+"""
+
+import argparse
+import gzip
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+import scrapers
+from scrapers import (pd, np, SITES, SITE_DEFINITIONS, fetch, get_session, http_cache, metrics, is_installed,
+                      iter_site_results, configure_rate_limit, DEFAULT_MAX_WORKERS)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(HERE, "bench_fixtures")
+RESULTS_PATH = os.path.join(HERE, "bench_results.jsonl")
+
+# Site -> fixture file holding its first listing page
+FIXTURES = {
+    "jiji": "jiji.json",
+    "realethio": "realethio.html",
+    "ethiopiarealty": "ethiopiarealty.html",
+    "livingethio": "livingethio.json"
+}
+
+# Fast enough that the pacing never waits; --paced keeps the real RATE_LIMITS
+UNPACED = {"rate": 1e6, "burst": 10 ** 6, "max_rate": 1e6}
+
+
+def load_fixture(site):
+    with open(os.path.join(FIXTURES_DIR, FIXTURES[site]), "rb") as f:
+        return f.read()
+
+
+def record_fixtures():
+    """Save the first listing page of every site over the fixtures"""
+    for site, filename in FIXTURES.items():
+        url, options = SITE_DEFINITIONS[site].page_request(1)
+        try:
+            response = fetch(url, use_cache=False, **{**options, "timeout": 30})
+            response.raise_for_status()
+        except Exception as e:
+            print(f"{site:15} not recorded: {e}")
+            continue
+        with open(os.path.join(FIXTURES_DIR, filename), "wb") as f:
+            f.write(response.content)
+        print(f"{site:15} {len(response.content):>9,} bytes -> {filename}")
+
+
+# ========================
+# STUB SERVER
+# ========================
+def stub_body(site, content, pages):
+    """A fixture as the stub serves it: paginated as if the site had ``pages`` pages"""
+    definition = SITE_DEFINITIONS[site]
+    if definition.page_count_path:
+        data = json.loads(content)
+        data[definition.page_count_path] = pages
+        return json.dumps(data).encode("utf-8")
+    if definition.page_links:
+        # The page count is read from the pagination widget
+        href = urlsplit(definition.page_request(pages)[0]).path
+        link = f'<ul class="pagination"><li><a class="page-link" href="{href}">{pages}</a></li></ul>'
+        return content.replace(b"</body>", link.encode("utf-8") + b"</body>", 1)
+    return content
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Requests arrive as /<original host>/<original path>
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        host = self.path.lstrip("/").split("/", 1)[0]
+        site = self.server.hosts.get(host)
+        if site is None:
+            self.send_error(404)
+            return
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        body, compressed = self.server.bodies[site]
+        content_type = "application/json" if SITE_DEFINITIONS[site].kind == "json" else "text/html; charset=UTF-8"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = compressed
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.bytes_sent += len(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """Serves every site's fixture from 127.0.0.1, with optional added latency per response"""
+
+    def __init__(self, pages, latency=0.0):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.daemon_threads = True
+        self.server.hosts = {urlsplit(definition.host).netloc: site for site, definition in SITE_DEFINITIONS.items()}
+        self.server.bodies = {}
+        for site in FIXTURES:
+            body = stub_body(site, load_fixture(site), pages)
+            self.server.bodies[site] = (body, gzip.compress(body))
+        self.server.latency = latency
+        self.server.lock = threading.Lock()
+        self.server.requests = 0
+        self.server.bytes_sent = 0
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def stub_adapter(base_url, pool_maxsize):
+    """A transport adapter that sends every request to the stub server instead of the real host"""
+    from requests.adapters import HTTPAdapter
+
+    class StubAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            parts = urlsplit(request.url)
+            request.url = f"{base_url}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+            return super().send(request, **kwargs)
+
+    return StubAdapter(pool_maxsize=pool_maxsize)
+
+
+def route_to_stub(base_url):
+    """Point the shared session at the stub server; returns the adapters to put back"""
+    session = get_session()
+    original = dict(session.adapters)
+    for prefix, adapter in original.items():
+        session.mount(prefix, stub_adapter(base_url, getattr(adapter, "_pool_maxsize", 10)))
+    return original
+
+
+# ========================
+# BENCHMARKS
+# ========================
+def bench_parse(repeat):
+    """Pages and listings parsed per second by every scraper, from the fixture bytes"""
+    results = {}
+    for site in SITES:
+        content = load_fixture(site)
+        listings = len(SITE_DEFINITIONS[site].parse_page(content))
+        start = time.perf_counter()
+        for _ in range(repeat):
+            SITE_DEFINITIONS[site].parse_page(content)
+        elapsed = time.perf_counter() - start
+        results[site] = {"pages_per_s": round(repeat / elapsed, 1),
+                         "listings_per_s": round(listings * repeat / elapsed, 1),
+                         "listings_per_page": listings, "page_bytes": len(content)}
+        print(f"  {site:15} {results[site]['pages_per_s']:>9,.1f} pages/s "
+              f"{results[site]['listings_per_s']:>11,.0f} listings/s  ({listings} per page)")
+    return results
+
+
+def bench_end_to_end(pages, runs, latency, max_workers):
+    """Wall time for every site scraping ``pages`` pages at once from the stub server"""
+    times, site_times, rows = [], {site: [] for site in SITES}, {}
+    with StubServer(pages, latency) as stub:
+        original = route_to_stub(stub.url)
+        metrics.reset()
+        try:
+            for _ in range(runs):
+                start = time.perf_counter()
+                for site, df, error in iter_site_results({site: pages for site in SITES}, max_workers):
+                    if error:
+                        raise RuntimeError(f"{site}: {error}")
+                    site_times[site].append(time.perf_counter() - start)
+                    rows[site] = len(df)
+                times.append(time.perf_counter() - start)
+        finally:
+            session = get_session()
+            for prefix, adapter in original.items():
+                session.mount(prefix, adapter)
+        requests_sent, bytes_sent = stub.server.requests, stub.server.bytes_sent
+
+    seconds = statistics.median(times)
+    results = {"pages_per_site": pages, "runs": runs, "latency_s": latency, "max_workers": max_workers,
+               "seconds": round(seconds, 3), "min_seconds": round(min(times), 3),
+               "pages_per_s": round(pages * len(SITES) / seconds, 1),
+               "requests": requests_sent // runs, "bytes": bytes_sent // runs,
+               "sites": {site: {"seconds": round(statistics.median(site_times[site]), 3), "rows": rows[site]}
+                         for site in SITES},
+               "metrics": metrics.summary()}
+    print(f"  {pages} pages x {len(SITES)} sites: {seconds:.3f} s median ({results['pages_per_s']:,.1f} pages/s)")
+    for site, result in results["sites"].items():
+        print(f"  {site:15} {result['seconds']:>8.3f} s  {result['rows']:>8,} rows")
+    return results
+
+
+def listing_frame(rows):
+    """``rows`` listings made of the parsed fixtures, each with its own link"""
+    base = pd.concat([SITE_DEFINITIONS[site].parse_page(load_fixture(site)) for site in SITES], ignore_index=True)
+    df = base.iloc[np.arange(rows) % len(base)].reset_index(drop=True)
+    df["Link"] = df["Link"] + "#" + pd.Series(np.arange(rows)).astype(str)
+    return df
+
+
+def bench_display(rows, runs):
+    """Time for RealEstateApp.display_results to fill the table with ``rows`` listings"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    import web
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    df = listing_frame(rows)
+    window = web.RealEstateApp()
+    window.show()
+    times = []
+    for _ in range(runs):
+        window.model.set_frame(pd.DataFrame())
+        app.processEvents()
+        start = time.perf_counter()
+        window.display_results(df)
+        app.processEvents()
+        times.append(time.perf_counter() - start)
+    window.close()
+
+    results = {"rows": rows, "runs": runs, "seconds": round(statistics.median(times), 4),
+               "min_seconds": round(min(times), 4)}
+    print(f"  {rows:,} rows: {results['seconds'] * 1000:.1f} ms median ({results['min_seconds'] * 1000:.1f} ms min)")
+    return results
+
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def last_run(path):
+    """The most recent run already in a results file, or None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def compare(run, previous):
+    """Print the headline numbers next to the previous run's"""
+    headlines = [("parse", site, "listings_per_s") for site in SITES]
+    headlines += [("end_to_end", None, "seconds"), ("display", None, "seconds")]
+    print(f"Compared with {previous.get('commit') or 'the previous run'} ({previous.get('timestamp')}):")
+    for section, site, key in headlines:
+        try:
+            now = run[section][site][key] if site else run[section][key]
+            before = previous[section][site][key] if site else previous[section][key]
+        except (KeyError, TypeError):
+            continue
+        change = (now - before) / before * 100 if before else 0.0
+        print(f"  {section + (' ' + site if site else ''):25} {key:15} {before:>12,.3f} -> {now:>12,.3f} ({change:+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50, help="parses of each fixture")
+    parser.add_argument("--pages", type=int, default=20, help="pages per site in the end-to-end run")
+    parser.add_argument("--runs", type=int, default=3, help="end-to-end and display repetitions")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the stub waits before each response")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS, help="sites scraped at once")
+    parser.add_argument("--paced", action="store_true", help="keep the per-site rate limits")
+    parser.add_argument("--rows", type=int, default=100000, help="rows for the table population benchmark")
+    parser.add_argument("--no-gui", action="store_true", help="skip the table population benchmark")
+    parser.add_argument("--output", default=RESULTS_PATH, help="JSON Lines file the run is appended to")
+    parser.add_argument("--record", action="store_true", help="refresh the fixtures from the live sites and exit")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record_fixtures()
+        return 0
+
+    # Every page has to come from the stub, not from responses cached by earlier real runs
+    http_cache.enabled = False
+    if not args.paced:
+        for site in SITES:
+            configure_rate_limit(site, **UNPACED)
+
+    run = {"timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"), "commit": git_commit(),
+           "python": platform.python_version(), "platform": platform.platform(),
+           "html_parser": scrapers.PARSER_BACKEND, "options": vars(args)}
+    print("Parse throughput:")
+    run["parse"] = bench_parse(args.repeat)
+    print("End to end against the stub server:")
+    run["end_to_end"] = bench_end_to_end(args.pages, args.runs, args.latency, args.workers)
+    if args.no_gui:
+        pass
+    elif not is_installed("PySide6"):
+        print("Table population: skipped, PySide6 is not installed")
+    else:
+        print("Table population (display_results):")
+        run["display"] = bench_display(args.rows, args.runs)
+
+    previous = last_run(args.output)
+    with open(args.output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run) + "\n")
+    print(f"Results appended to {args.output}")
+    if previous is not None:
+        compare(run, previous)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""Measure import time of the scraping layer, the CLI and the GUI module.
+
+Each import runs in a fresh interpreter so nothing is already cached in sys.modules.
+
+    python bench_startup.py --runs 10 --json startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODULES = ["scrapers", "scrape_cli", "web"]
+
+PROBE = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def time_import(module, runs):
+    """Return per-run import times for module in milliseconds"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    times = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", PROBE.format(module=module)],
+                                cwd=here, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        times.append(float(result.stdout.strip().splitlines()[-1]) * 1000)
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for module in args.modules:
+        try:
+            times = time_import(module, args.runs)
+        except RuntimeError as e:
+            print(f"{module:12} failed: {e}")
+            continue
+        results[module] = {"median_ms": round(statistics.median(times), 1),
+                           "min_ms": round(min(times), 1), "runs": args.runs}
+        print(f"{module:12} {results[module]['median_ms']:8.1f} ms median "
+              f"({results[module]['min_ms']:.1f} ms min)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""Headless batch scraping for cron and server runs.
+
+    python scrape_cli.py --jiji 5 --livingethio 3 -o listings.csv
+    python scrape_cli.py --config sites.json -o listings.parquet
+
+The config file is JSON, e.g. {"pages": {"jiji": 5, "realethio": 2}, "incremental": true,
+"rate_limits": {"jiji": {"rate": 2, "max_rate": 6}}, "metrics": "metrics.prom"}.
+Command-line options override it. Exits with 1 when a site fails or skips pages, or the
+output cannot be written. The first Ctrl+C stops scraping at the next page and still writes what was
+fetched (exit code 130); a second one aborts. Never imports Qt.
+"""
+
+import argparse
+import json
+import signal
+import sys
+import threading
+
+from scrapers import (pd, SITES, SITE_DEFINITIONS, DEFAULT_MAX_WORKERS, RATE_LIMITS, http_cache, iter_site_results,
+                      export_listings, configure_rate_limit, enrich_listings, dedupe_listings,
+                      drop_duplicate_listings, listing_store, seen_listings, metrics)
+
+OUTPUT_FORMATS = ["csv", "jsonl", "json", "parquet", "feather", "xlsx"]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape real estate listings without the GUI.")
+    parser.add_argument("--config", help="JSON file with per-site page counts and options")
+    for site in SITES:
+        parser.add_argument(f"--{site}", type=int, metavar="PAGES",
+                            help=f"pages to scrape from {SITE_DEFINITIONS[site].label}")
+    parser.add_argument("-o", "--output", help="output file (default: listings.<format>)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, help="output format (default: from --output, else csv)")
+    parser.add_argument("--workers", type=int, help=f"sites scraped at once (default: {DEFAULT_MAX_WORKERS})")
+    parser.add_argument("--incremental", action="store_true", default=None,
+                        help="only keep listings not seen in earlier runs")
+    parser.add_argument("--no-cache", action="store_true", default=None, help="bypass the HTTP cache")
+    parser.add_argument("--drop-duplicates", action="store_true", default=None,
+                        help="keep one row per property listed on several sites")
+    parser.add_argument("--save", action="store_true", default=None,
+                        help="add the results to the local listing store")
+    parser.add_argument("--from-store", action="store_true", default=None,
+                        help="export every listing in the local store (after saving this run, if any)")
+    parser.add_argument("--details", action="store_true", default=None,
+                        help="fetch each listing's page for bedrooms, posting date and description")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write request and parse metrics per site: JSON for .json, else Prometheus text")
+    return parser.parse_args(argv)
+
+def load_config(path):
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    unknown = (set(config.get("pages", {})) | set(config.get("rate_limits", {}))) - set(SITES)
+    if unknown:
+        raise ValueError(f"Unknown site(s) in config: {', '.join(sorted(unknown))}")
+    for site, limits in config.get("rate_limits", {}).items():
+        bad = set(limits) - set(RATE_LIMITS[site])
+        if bad:
+            raise ValueError(f"Unknown rate limit option(s) for {site}: {', '.join(sorted(bad))}")
+    return config
+
+def resolve_options(args):
+    """Merge the config file with command-line options, which take precedence"""
+    config = load_config(args.config) if args.config else {}
+
+    pages = {site: int(config.get("pages", {}).get(site, 0)) for site in SITES}
+    for site in SITES:
+        if getattr(args, site) is not None:
+            pages[site] = getattr(args, site)
+
+    fmt = args.format or config.get("format")
+    output = args.output or config.get("output")
+    if fmt is None:
+        fmt = next((f for f in OUTPUT_FORMATS if output and output.endswith(f".{f}")), "csv")
+    if output is None:
+        output = f"listings.{fmt}"
+    elif not output.endswith(f".{fmt}"):
+        output = f"{output}.{fmt}"
+
+    return {
+        "pages": pages,
+        "output": output,
+        "workers": args.workers or config.get("workers", DEFAULT_MAX_WORKERS),
+        "incremental": args.incremental if args.incremental is not None else bool(config.get("incremental", False)),
+        "use_cache": not (args.no_cache if args.no_cache is not None else bool(config.get("no_cache", False))),
+        "rate_limits": config.get("rate_limits", {}),
+        "details": args.details if args.details is not None else bool(config.get("details", False)),
+        "drop_duplicates": (args.drop_duplicates if args.drop_duplicates is not None
+                            else bool(config.get("drop_duplicates", False))),
+        "save": args.save if args.save is not None else bool(config.get("save", False)),
+        "from_store": args.from_store if args.from_store is not None else bool(config.get("from_store", False)),
+        "metrics": args.metrics or config.get("metrics")
+    }
+
+def stop_on_interrupt(cancel):
+    """Make Ctrl+C set ``cancel`` instead of killing the run; a second Ctrl+C aborts"""
+    def interrupted(signum, frame):
+        if cancel.is_set():
+            raise KeyboardInterrupt
+        print("Stopping at the next page; press Ctrl+C again to abort", file=sys.stderr)
+        cancel.set()
+
+    # Signal handlers can only be installed from the main thread
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGINT, interrupted)
+
+def scrape(options, cancel=None, seen=None):
+    """Run the scrapers, tag duplicates and fetch details; returns (listings, failed sites).
+
+    Incremental runs add the fingerprints of the pages read to ``seen``.
+    """
+    frames = []
+    failed = []
+
+    skipped = []
+
+    def report_skip(site, page, url, reason):
+        # Called from the site workers
+        skipped.append(site)
+        print(f"{site}: skipped page {page} ({url}): {reason}", file=sys.stderr)
+
+    for site, df, error in iter_site_results(options["pages"], options["workers"], options["incremental"],
+                                             on_skip=report_skip, cancel=cancel, seen=seen):
+        site_skips = skipped.count(site)
+        if error:
+            failed.append(site)
+            print(f"{site}: failed: {error}", file=sys.stderr)
+        else:
+            if site_skips:
+                # Results with missing pages are incomplete, so the run counts as failed
+                failed.append(site)
+                print(f"{site}: {len(df)} listings, {site_skips} pages skipped", file=sys.stderr)
+            else:
+                print(f"{site}: {len(df)} listings", file=sys.stderr)
+            if not df.empty:
+                frames.append(df)
+
+    result = pd.concat(frames).reset_index(drop=True) if frames else pd.DataFrame()
+    if not result.empty:
+        result = dedupe_listings(result)
+        duplicates = len(result) - result["Listing ID"].nunique()
+        print(f"{duplicates} listings are duplicates from another site", file=sys.stderr)
+    if options["details"] and not result.empty and not (cancel is not None and cancel.is_set()):
+        print(f"Fetching details for {len(result)} listings", file=sys.stderr)
+        result = enrich_listings(result, cancel=cancel)
+    return result, failed
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        options = resolve_options(args)
+    except (OSError, ValueError) as e:
+        print(f"Config error: {e}", file=sys.stderr)
+        return 2
+
+    scraping = any(pages > 0 for pages in options["pages"].values())
+    if not scraping and not options["from_store"]:
+        print("Nothing to scrape: give at least one site a page count", file=sys.stderr)
+        return 2
+
+    http_cache.enabled = options["use_cache"]
+    for site, limits in options["rate_limits"].items():
+        configure_rate_limit(site, **limits)
+
+    cancel = threading.Event()
+    stop_on_interrupt(cancel)
+    seen = []
+    result, failed = scrape(options, cancel, seen) if scraping else (pd.DataFrame(), [])
+    if options["metrics"]:
+        try:
+            metrics.dump(options["metrics"])
+        except OSError as e:
+            print(f"Could not write {options['metrics']}: {e}", file=sys.stderr)
+    if options["save"] and not result.empty:
+        changed = listing_store.upsert(result)
+        print(f"Saved {len(result)} listings to {listing_store.path} ({changed} new or changed)", file=sys.stderr)
+    if options["from_store"]:
+        result = listing_store.load()
+        print(f"Read {len(result)} listings from {listing_store.path}", file=sys.stderr)
+    if options["drop_duplicates"] and not result.empty:
+        result = drop_duplicate_listings(result)
+
+    try:
+        export_listings(result, options["output"])
+    except Exception as e:
+        print(f"Could not write {options['output']}: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Wrote {len(result)} listings to {options['output']}", file=sys.stderr)
+    # Only now are this run's listings written, so the next incremental run can skip them
+    seen_listings.remember(seen)
+    if cancel.is_set():
+        return 130
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
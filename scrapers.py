@@ -0,0 +1,2255 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""Scraping layer: fetching, parsing, normalizing and exporting listings.
+
+Has no Qt dependency, so the GUI (web.py) and headless runs (scrape_cli.py) share it.
+"""
+
+import re
+import sys
+import asyncio
+import sqlite3
+import json
+import hashlib
+import threading
+import warnings
+import time
+import random
+import os
+import importlib.util
+import bisect
+from urllib.parse import urlencode, urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait as wait_futures, FIRST_COMPLETED
+from contextlib import aclosing
+from difflib import SequenceMatcher
+
+def lazy_import(name):
+    """Return a module that is only executed on first attribute access"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+def is_installed(name):
+    """Check for an optional dependency without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ValueError:
+        return name in sys.modules
+
+# pandas, numpy and requests dominate start-up time; they load on first use instead
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+requests = lazy_import("requests")
+
+# ========================
+# UTILITY FUNCTIONS
+# ========================
+# Patterns compiled once, shared by the clean_* helpers and normalize_listings
+ARTIFACT_PATTERN = re.compile(r'[Â©ª«¬®°±²³µ¶·¸¹º»¼½¾¿]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+NON_NUMERIC_PATTERN = re.compile(r'[^\d,]')
+
+def clean_text(text):
+    """Clean text from encoding artifacts and extra spaces"""
+    if pd.isna(text) or not isinstance(text, str):
+        return text
+    cleaned = ARTIFACT_PATTERN.sub('', text)
+    return WHITESPACE_PATTERN.sub(' ', cleaned).strip()
+
+def clean_numeric(value):
+    """Extract and clean numeric values from text"""
+    if pd.isna(value) or not isinstance(value, str):
+        return value
+    return NON_NUMERIC_PATTERN.sub('', value)
+
+def format_price(price):
+    """Format price with commas as thousand separators"""
+    try:
+        price_str = str(price)
+        if price_str.replace(',', '').isdigit():
+            return "{:,}".format(int(price_str.replace(',', '')))
+        return price_str
+    except Exception:
+        return price
+
+def safe_convert_to_float(value):
+    """Safely convert string to float, handling commas and empty values"""
+    try:
+        if isinstance(value, str):
+            value = value.replace(',', '')
+        return float(value) if value else 0.0
+    except (ValueError, TypeError):
+        return 0.0
+
+# ========================
+# NORMALIZATION
+# ========================
+LISTING_COLUMNS = ["Title", "Price", "Location", "Size (sqm)", "Link", "Source"]
+
+# Every site prices in Ethiopian birr (LivingEthio writes it "Br.")
+CURRENCIES = ["ETB"]
+
+def format_listing_price(price, currency):
+    """Display text for a numeric price, e.g. "ETB 1,234,000", or "N/A" when missing"""
+    return "N/A" if pd.isna(price) else f"{currency} {int(price):,}"
+
+def currency_column(currency, length):
+    """A categorical column holding ``currency`` ``length`` times"""
+    return pd.Categorical.from_codes([CURRENCIES.index(currency)] * length, categories=CURRENCIES)
+
+def _price_value(price):
+    # None means the site gave no price; anything without digits is not a usable price
+    if price is None:
+        return float("nan")
+    digits = NON_NUMERIC_PATTERN.sub('', str(price)).replace(',', '')
+    try:
+        return float(digits)
+    except ValueError:
+        return float("nan")
+
+def _size_value(size):
+    try:
+        value = float(str(size).replace(',', ''))
+    except ValueError:
+        return 0.0
+    return 0.0 if value != value else value
+
+def normalize_listings(raw, currency, clean_size=True):
+    """Turn raw extracted records into the cleaned listing frame, one column at a time.
+
+    ``raw`` holds the text exactly as scraped. Each column is cleaned in one pass over a
+    plain list with the precompiled patterns, and the frame is built once. Price becomes a
+    float column (NaN when the listing has no usable price) alongside a categorical
+    Currency column.
+    """
+    sizes = [entry["Size (sqm)"] for entry in raw]
+    if clean_size:
+        sizes = [clean_numeric(size) for size in sizes]
+    return pd.DataFrame({
+        "Title": pd.Series([clean_text(entry["Title"]) for entry in raw], dtype=object),
+        "Price": pd.Series([_price_value(entry["Price"]) for entry in raw], dtype=float),
+        "Location": pd.Series([clean_text(entry["Location"]) for entry in raw], dtype=object),
+        "Size (sqm)": pd.Series([_size_value(size) for size in sizes], dtype=float),
+        "Link": pd.Series([entry["Link"] for entry in raw], dtype=str),
+        "Source": pd.Series([entry["Source"] for entry in raw], dtype=str),
+        "Currency": currency_column(currency, len(raw))
+    })
+
+# ========================
+# HTTP SESSION
+# ========================
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36"
+}
+
+# The site tables below are filled in by register_site (see SITE DEFINITIONS)
+
+# Maximum number of requests in flight at once for each site
+SITE_CONCURRENCY = {}
+
+# Every site that has a scraper, in the order they are run and listed
+SITES = []
+
+SITE_HOSTS = {}
+
+# Keep-alive connections kept open per host; never fewer than the site's concurrency
+POOL_SIZES = {}
+DEFAULT_POOL_SIZE = 4
+
+# gzip/deflate always, plus brotli (and zstd) when the decoders are installed
+SESSION_HEADERS = {"Connection": "keep-alive"}
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Return the shared pooled session, creating it on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            from requests.adapters import HTTPAdapter
+            from urllib3.exceptions import InsecureRequestWarning
+
+            # Listing sites are fetched with verify=False
+            warnings.filterwarnings("ignore", category=InsecureRequestWarning)
+            session = requests.Session()
+            session.headers.update(SESSION_HEADERS)
+            session.headers["Accept-Encoding"] = requests.utils.DEFAULT_ACCEPT_ENCODING
+            session.mount("https://", HTTPAdapter(pool_connections=len(POOL_SIZES) or 1,
+                                                  pool_maxsize=DEFAULT_POOL_SIZE))
+            session.mount("http://", HTTPAdapter(pool_maxsize=DEFAULT_POOL_SIZE))
+            for host, size in POOL_SIZES.items():
+                session.mount(host, HTTPAdapter(pool_connections=1, pool_maxsize=size))
+            _session = session
+        return _session
+
+# ========================
+# RATE LIMITING
+# ========================
+# Token bucket per site: `rate` requests/s to start with, bursts of up to `burst`, and
+# never faster than `max_rate` however well the host responds
+RATE_LIMITS = {}
+DEFAULT_RATE_LIMIT = {"rate": 2.0, "burst": 4, "max_rate": 8.0}
+MIN_RATE = 0.1               # slowest pace after backing off, in requests/s
+RATE_INCREASE = 0.25         # added to the rate after each good response
+RATE_DECREASE = 0.5          # rate multiplier on 429/503 or a slow response,
+DECREASE_INTERVAL = 1.0      # applied at most once a second so a burst of failures counts once
+LATENCY_BACKOFF = 2.0        # responses this many times slower than usual count as trouble,
+SLOW_LATENCY = 1.0           # as long as they also took at least this many seconds
+THROTTLE_STATUSES = (429, 503)
+
+def retry_after_seconds(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class HostRateLimiter:
+    """Adaptive token bucket for one host; additive increase, multiplicative decrease"""
+
+    def __init__(self, rate, burst, max_rate):
+        self.rate = float(rate)
+        self.burst = max(1, burst)
+        self.max_rate = max(float(max_rate), self.rate)
+        self.tokens = float(self.burst)
+        self.latency = None
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._decreased_at = None
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, cancel=None):
+        """Block until a request may be sent; False if the ``cancel`` event was set first"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            if cancel is None:
+                time.sleep(wait)
+            elif cancel.wait(wait):
+                return False
+
+    def record(self, status, latency, retry_after=None, slow_down=True):
+        """Adjust the rate from one request's outcome; status is None when the request failed.
+
+        A request that never got an answer (refused, timed out) leaves the rate alone: a host
+        that is down is the circuit breaker's business. ``slow_down=False`` (a retry of a
+        request already failing) never lowers the rate either.
+        """
+        with self._lock:
+            slow = (self.latency is not None and latency > SLOW_LATENCY
+                    and latency > LATENCY_BACKOFF * self.latency)
+            now = time.monotonic()
+            if status is None:
+                pass
+            elif status in THROTTLE_STATUSES or slow:
+                if slow_down and (self._decreased_at is None or now - self._decreased_at >= DECREASE_INTERVAL):
+                    self.rate = max(MIN_RATE, self.rate * RATE_DECREASE)
+                    self.tokens = min(self.tokens, 0.0)
+                    self._decreased_at = now
+            elif status < 500:
+                self.rate = min(self.max_rate, self.rate + RATE_INCREASE)
+            if retry_after is not None:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            if status is not None:
+                self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+def _host(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+def configure_rate_limit(site, **limits):
+    """Override rate, burst or max_rate for a site; applies to limiters created afterwards"""
+    RATE_LIMITS[site] = {**RATE_LIMITS.get(site, DEFAULT_RATE_LIMIT), **limits}
+    with _rate_limiters_lock:
+        _rate_limiters.pop(_host(SITE_HOSTS.get(site, site)), None)
+
+def get_rate_limiter(url):
+    """Return the shared limiter for the host of a URL"""
+    host = _host(url)
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(host)
+        if limiter is None:
+            limiter = HostRateLimiter(**RATE_LIMITS.get(site_for_url(url), DEFAULT_RATE_LIMIT))
+            _rate_limiters[host] = limiter
+        return limiter
+
+def _limited_get(url, cancel=None, slow_down=True, **kwargs):
+    """Send one GET once the host's rate limiter allows it, and report back how it went.
+
+    ``slow_down=False`` keeps a throttled answer from lowering the host's rate (used for retries).
+    """
+    limiter = get_rate_limiter(url)
+    if not limiter.acquire(cancel):
+        raise ScrapeCancelled(f"Cancelled before fetching {url}")
+    started = time.monotonic()
+    try:
+        response = get_session().get(url, **kwargs)
+    except Exception:
+        metrics.record_request(site_for_url(url), None, time.monotonic() - started)
+        limiter.record(None, time.monotonic() - started)
+        raise
+    latency = time.monotonic() - started
+    # Bytes on the wire; Content-Length is the compressed size when the body was gzipped
+    size = response.headers.get("Content-Length")
+    metrics.record_request(site_for_url(url), response.status_code, latency,
+                           int(size) if size and size.isdigit() else len(response.content))
+    retry_after = None
+    if response.status_code in THROTTLE_STATUSES:
+        retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+    limiter.record(response.status_code, latency, retry_after, slow_down)
+    return response
+
+# ========================
+# RETRIES AND CIRCUIT BREAKER
+# ========================
+DEFAULT_TIMEOUT = 15         # seconds, for requests that do not set their own
+RETRY_ATTEMPTS = 3           # tries per request, including the first
+RETRY_BASE_DELAY = 0.5       # seconds; doubles with every attempt
+RETRY_MAX_DELAY = 10.0
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+CIRCUIT_FAILURES = 5         # consecutive failed attempts (retries included) that open a host's circuit
+CIRCUIT_RESET = 60.0         # seconds before an open circuit lets a trial request through
+
+class CircuitOpen(Exception):
+    """Raised instead of sending a request to a host that keeps failing"""
+
+class ScrapeCancelled(Exception):
+    """Raised instead of sending a request once the run's cancel event is set"""
+
+class CircuitBreaker:
+    """Closed while a host works; open (fail fast) after repeated failures; half-open after a pause"""
+
+    def __init__(self, failures=CIRCUIT_FAILURES, reset=CIRCUIT_RESET):
+        self.failures = failures
+        self.reset = reset
+        self.consecutive = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a request may be sent now; in half-open state only one trial at a time"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset or self._trial:
+                return False
+            self._trial = True
+            return True
+
+    @property
+    def trial(self):
+        """Whether the half-open trial request is in flight"""
+        return self._trial
+
+    def release(self):
+        """End a trial that got no answer from the host (e.g. it was cancelled); the circuit stays as it was"""
+        with self._lock:
+            self._trial = False
+
+    def success(self):
+        with self._lock:
+            self.consecutive = 0
+            self._opened_at = None
+            self._trial = False
+
+    def failure(self):
+        """Count one failed attempt; True when the circuit is now open"""
+        with self._lock:
+            self.consecutive += 1
+            if self._trial or self.consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+            self._trial = False
+            return self._opened_at is not None
+
+_circuit_breakers = {}
+_circuit_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(url):
+    """Return the shared circuit breaker for the host of a URL"""
+    host = _host(url)
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(host)
+        if breaker is None:
+            breaker = _circuit_breakers[host] = CircuitBreaker()
+        return breaker
+
+def reset_circuit_breakers():
+    """Close every circuit, e.g. before a new run"""
+    with _circuit_breakers_lock:
+        _circuit_breakers.clear()
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff before retry number ``attempt`` (1-based)"""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+def _get(url, retries=RETRY_ATTEMPTS, cancel=None, **kwargs):
+    """GET with retries on connection errors and retryable statuses, guarded by the host's breaker.
+
+    Once the ``cancel`` event is set no further attempt is made and ScrapeCancelled is raised.
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    breaker = get_circuit_breaker(url)
+    for attempt in range(1, max(1, retries) + 1):
+        if cancel is not None and cancel.is_set():
+            raise ScrapeCancelled(f"Cancelled before fetching {url}")
+        if not breaker.allow():
+            raise CircuitOpen(f"{_host(url)} is failing; skipped {url}")
+        # Every failed attempt counts toward the breaker; once it opens (a failed half-open
+        # trial reopens it at once) the request is not retried
+        trial = breaker.trial
+        try:
+            response = _limited_get(url, cancel=cancel, slow_down=attempt == 1, **kwargs)
+        except requests.RequestException:
+            if breaker.failure() or attempt >= retries:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES:
+                breaker.success()
+                return response
+            if breaker.failure() or attempt >= retries:
+                return response
+        finally:
+            # Anything else (cancelled, unexpected errors) must not leave the trial taken
+            if trial:
+                breaker.release()
+        # A Retry-After on the response already holds back the host's rate limiter
+        if cancel is None:
+            time.sleep(backoff_delay(attempt))
+        else:
+            cancel.wait(backoff_delay(attempt))
+
+# ========================
+# METRICS
+# ========================
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)        # seconds per request
+PARSE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)   # seconds per page
+
+class Histogram:
+    """Counts of observations per bucket upper bound, Prometheus style; the last bucket is +Inf"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate of the q-quantile, interpolated inside its bucket; None before any observation"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                low = self.buckets[i - 1] if i > 0 else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else low
+                return low + (high - low) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def to_dict(self):
+        return {"buckets": list(self.buckets), "counts": list(self.counts), "sum": self.sum, "count": self.count}
+
+class ScrapeMetrics:
+    """Per-site request and parse statistics, updated from the fetch and parse paths of every scraper.
+
+    Thread-safe; ``snapshot()`` returns a plain dict for the GUI, JSON and Prometheus output.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites = {}
+
+    def _site(self, site):
+        if site not in self._sites:
+            self._sites[site] = {"requests": 0, "errors": 0, "statuses": {}, "bytes": 0, "cache_hits": 0,
+                                 "latency": Histogram(LATENCY_BUCKETS), "pages": 0, "skipped": 0, "rows": 0,
+                                 "parse": Histogram(PARSE_BUCKETS)}
+        return self._sites[site]
+
+    def record_request(self, site, status, latency, size=0):
+        """One HTTP request; status is None when no response came back"""
+        with self._lock:
+            stats = self._site(site)
+            stats["requests"] += 1
+            if status is None:
+                stats["errors"] += 1
+            else:
+                stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+                stats["bytes"] += size
+            stats["latency"].observe(latency)
+
+    def record_cache_hit(self, site):
+        with self._lock:
+            self._site(site)["cache_hits"] += 1
+
+    def record_page(self, site, seconds, rows):
+        """One page parsed into ``rows`` listings"""
+        with self._lock:
+            stats = self._site(site)
+            stats["pages"] += 1
+            stats["rows"] += rows
+            stats["parse"].observe(seconds)
+
+    def record_skip(self, site):
+        with self._lock:
+            self._site(site)["skipped"] += 1
+
+    def reset(self):
+        with self._lock:
+            self._sites = {}
+
+    def snapshot(self):
+        """Site -> statistics as plain values, histograms included"""
+        with self._lock:
+            return {site: {**stats, "statuses": dict(stats["statuses"]),
+                           "latency": stats["latency"].to_dict(), "parse": stats["parse"].to_dict()}
+                    for site, stats in self._sites.items()}
+
+    def summary(self):
+        """Site -> headline numbers (latency and parse time quantiles in seconds)"""
+        with self._lock:
+            return {site: {"requests": stats["requests"], "errors": stats["errors"],
+                           "statuses": dict(sorted(stats["statuses"].items())), "bytes": stats["bytes"],
+                           "cache_hits": stats["cache_hits"],
+                           "latency_p50": stats["latency"].quantile(0.5), "latency_p95": stats["latency"].quantile(0.95),
+                           "pages": stats["pages"], "skipped": stats["skipped"], "rows": stats["rows"],
+                           "parse_seconds": stats["parse"].sum,
+                           "parse_p50": stats["parse"].quantile(0.5), "parse_p95": stats["parse"].quantile(0.95)}
+                    for site, stats in self._sites.items()}
+
+    def to_json(self):
+        return json.dumps({"sites": self.snapshot(), "summary": self.summary()}, indent=2)
+
+    def to_prometheus(self):
+        """The statistics in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        def counter(name, help_text, key):
+            family(name, "counter", help_text,
+                   [f'{name}{{site="{site}"}} {stats[key]}' for site, stats in snapshot.items()])
+
+        def histogram(name, help_text, key):
+            samples = []
+            for site, stats in snapshot.items():
+                hist = stats[key]
+                cumulative = 0
+                for bound, count in zip(list(hist["buckets"]) + ["+Inf"], hist["counts"]):
+                    cumulative += count
+                    samples.append(f'{name}_bucket{{site="{site}",le="{bound}"}} {cumulative}')
+                samples.append(f'{name}_sum{{site="{site}"}} {hist["sum"]}')
+                samples.append(f'{name}_count{{site="{site}"}} {hist["count"]}')
+            family(name, "histogram", help_text, samples)
+
+        family("scraper_responses_total", "counter", "HTTP responses received, by status code",
+               [f'scraper_responses_total{{site="{site}",status="{status}"}} {count}'
+                for site, stats in snapshot.items() for status, count in sorted(stats["statuses"].items())])
+        counter("scraper_request_errors_total", "Requests that got no response", "errors")
+        histogram("scraper_request_duration_seconds", "Time from sending a request to its response", "latency")
+        counter("scraper_response_bytes_total", "Response bytes downloaded", "bytes")
+        counter("scraper_cache_hits_total", "Pages served from the HTTP cache without a request", "cache_hits")
+        counter("scraper_pages_parsed_total", "Listing pages parsed", "pages")
+        counter("scraper_pages_skipped_total", "Pages given up on after retries or unreadable", "skipped")
+        histogram("scraper_parse_duration_seconds", "Time to parse one listing page", "parse")
+        counter("scraper_rows_total", "Listings parsed from pages", "rows")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, filename):
+        """Write the statistics as JSON (.json) or Prometheus text (any other extension)"""
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(self.to_json() if filename.lower().endswith(".json") else self.to_prometheus())
+
+metrics = ScrapeMetrics()
+
+def site_for_url(url):
+    """The SITES key whose host serves a URL, or the URL's host for any other site"""
+    host = _host(url)
+    return next((site for site, site_host in SITE_HOSTS.items() if site_host == host), urlsplit(url).netloc)
+
+# ========================
+# HTTP CACHE
+# ========================
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".scraper_data")
+CACHE_PATH = os.path.join(DATA_DIR, "http_cache.sqlite")
+CACHE_TTL = 60 * 60                  # serve without revalidating for an hour
+CACHE_MAX_AGE = 7 * 24 * 60 * 60     # drop entries not refreshed for a week
+CACHE_MAX_BYTES = 200 * 1024 * 1024  # keep the cache under 200 MB
+
+class HttpCache:
+    """Persistent response cache keyed by URL and query parameters"""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_age=CACHE_MAX_AGE, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    url TEXT,
+                    status INTEGER,
+                    headers TEXT,
+                    body BLOB,
+                    etag TEXT,
+                    last_modified TEXT,
+                    stored_at REAL,
+                    size INTEGER
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_stored_at ON responses (stored_at)")
+        return self._conn
+
+    @staticmethod
+    def make_key(url, params=None):
+        return url + "?" + urlencode(sorted((params or {}).items()), doseq=True)
+
+    def get(self, key):
+        """Return the cached entry for a key as a dict, or None"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT url, status, headers, body, etag, last_modified, stored_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        url, status, headers, body, etag, last_modified, stored_at = row
+        return {"url": url, "status": status, "headers": json.loads(headers), "body": body,
+                "etag": etag, "last_modified": last_modified, "stored_at": stored_at}
+
+    def is_fresh(self, entry):
+        return time.time() - entry["stored_at"] < self.ttl
+
+    def put(self, key, response):
+        body = response.content
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.url, response.status_code, json.dumps(dict(response.headers)), body,
+                 response.headers.get("ETag"), response.headers.get("Last-Modified"), time.time(), len(body))
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def touch(self, key):
+        """Mark an entry as freshly revalidated"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+            conn.execute("VACUUM")
+
+    def _evict(self, conn):
+        # Age first, then the oldest entries until the cache fits in max_bytes
+        conn.execute("DELETE FROM responses WHERE stored_at < ?", (time.time() - self.max_age,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY stored_at").fetchall():
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    @staticmethod
+    def to_response(entry):
+        """Rebuild a requests.Response from a cached entry"""
+        from requests.structures import CaseInsensitiveDict
+
+        response = requests.models.Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["body"]
+        response.url = entry["url"]
+        response.from_cache = True
+        return response
+
+http_cache = HttpCache()
+
+def fetch(url, use_cache=True, **kwargs):
+    """GET a URL with retries, rate limiting and the host's circuit breaker, served from the HTTP cache when possible"""
+    if not (use_cache and http_cache.enabled):
+        return _get(url, **kwargs)
+
+    key = http_cache.make_key(url, kwargs.get("params"))
+    entry = http_cache.get(key)
+    if entry is not None and http_cache.is_fresh(entry):
+        metrics.record_cache_hit(site_for_url(url))
+        return http_cache.to_response(entry)
+
+    # Stale entries are revalidated with ETag / Last-Modified instead of downloaded again
+    if entry is not None:
+        headers = dict(kwargs.get("headers") or {})
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        kwargs["headers"] = headers
+
+    response = _get(url, **kwargs)
+    if response.status_code == 304 and entry is not None:
+        http_cache.touch(key)
+        return http_cache.to_response(entry)
+    if response.status_code == 200:
+        http_cache.put(key, response)
+    return response
+
+# ========================
+# INCREMENTAL SCRAPING
+# ========================
+SEEN_PATH = os.path.join(DATA_DIR, "seen_listings.sqlite")
+
+def listing_fingerprints(df):
+    """Hash of the fields that make a listing 'changed' when they differ, one per row"""
+    # Missing values (a NaN price, a None title) hash as empty text
+    joined = df["Title"].fillna("").astype(str)
+    for field in ("Price", "Location", "Size (sqm)"):
+        joined = joined + "|" + df[field].fillna("").astype(str)
+    return [hashlib.sha1(text.encode("utf-8")).hexdigest() for text in joined]
+
+class SeenListings:
+    """Persisted (Source, Link) -> fingerprint map used by incremental runs"""
+
+    def __init__(self, path=SEEN_PATH):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS seen (
+                    source TEXT,
+                    link TEXT,
+                    fingerprint TEXT,
+                    last_seen REAL,
+                    PRIMARY KEY (source, link)
+                )""")
+        return self._conn
+
+    def filter_new(self, df, pending=None):
+        """Return the new or changed rows of a listing frame, and (source, link, fingerprint) for every row.
+
+        Nothing is stored here: pass the rows to remember() once the listings have been
+        written out, so a run that fails before that emits them again next time. Listings
+        in ``pending`` ((source, link) -> fingerprint, from earlier pages of the same run)
+        count as seen, and the page's rows are added to it.
+        """
+        if df.empty:
+            return df, []
+        rows = list(zip(df["Source"], df["Link"], listing_fingerprints(df)))
+        with self._lock:
+            conn = self._connect()
+            fresh = []
+            for source, link, fingerprint in rows:
+                if pending is not None and pending.get((source, link)) == fingerprint:
+                    fresh.append(False)
+                    continue
+                row = conn.execute("SELECT fingerprint FROM seen WHERE source = ? AND link = ?",
+                                   (source, link)).fetchone()
+                fresh.append(row is None or row[0] != fingerprint)
+        if pending is not None:
+            pending.update(((source, link), fingerprint) for source, link, fingerprint in rows)
+        return df[fresh], rows
+
+    def remember(self, rows):
+        """Store (source, link, fingerprint) rows from filter_new as seen"""
+        if not rows:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.executemany("INSERT OR REPLACE INTO seen VALUES (?, ?, ?, ?)",
+                             [(source, link, fingerprint, now) for source, link, fingerprint in rows])
+            conn.commit()
+
+    def clear(self, source=None):
+        with self._lock:
+            conn = self._connect()
+            if source is None:
+                conn.execute("DELETE FROM seen")
+            else:
+                conn.execute("DELETE FROM seen WHERE source = ?", (source,))
+            conn.commit()
+
+seen_listings = SeenListings()
+
+# ========================
+# ASYNC FETCH ENGINE
+# ========================
+CANCEL_POLL = 0.1            # seconds between checks of a run's cancel event while waiting for a response
+
+class StopPaging(Exception):
+    """Raised by a page parser when no further pages should be read"""
+
+async def fetch_all(page_requests, concurrency, cancel=None):
+    """Fetch (url, kwargs) pairs concurrently; responses (or exceptions) come back in request order"""
+    return [response async for response in iter_responses(page_requests, concurrency, cancel)]
+
+async def iter_responses(page_requests, concurrency, cancel=None):
+    """Fetch (url, kwargs) pairs concurrently, yielding responses (or exceptions) in request order.
+
+    Each response is yielded as soon as it and every response before it have arrived.
+    Once the ``cancel`` event (a threading.Event) is set, requests still running are
+    abandoned and every remaining request yields a ScrapeCancelled.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch_one(url, kwargs):
+        async with semaphore:
+            if cancel is not None:
+                kwargs = dict(kwargs, cancel=cancel)
+            return await asyncio.to_thread(fetch, url, **kwargs)
+
+    tasks = [asyncio.ensure_future(fetch_one(url, kwargs)) for url, kwargs in page_requests]
+    try:
+        for task in tasks:
+            if cancel is not None:
+                # Poll, so a stop is noticed while a slow response is still on its way
+                while not task.done() and not cancel.is_set():
+                    await asyncio.wait({task}, timeout=CANCEL_POLL)
+                if cancel.is_set():
+                    yield ScrapeCancelled("Scrape cancelled")
+                    continue
+            try:
+                yield await task
+            except Exception as e:
+                yield e
+    finally:
+        # Pages not consumed yet (early stop) are dropped
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def iter_pages(page_requests, concurrency, parse_response, incremental=False, prefetched=(), on_skip=None,
+                     site=None, cancel=None, seen=None):
+    """Fetch pages and yield the parsed listing frame of each page, in page order.
+
+    ``prefetched`` holds responses already fetched for the first pages of ``page_requests``.
+    In incremental mode pages are fetched one concurrency-sized wave at a time, only
+    new or changed listings are kept, and paging stops at the first page with nothing new;
+    the fingerprints of every page read are added to the ``seen`` list, for
+    seen_listings.remember() once the run's results are safely written.
+    Pages that cannot be fetched or parsed are reported to ``on_skip(page, url, reason)``.
+    Parse times and rows are recorded in ``metrics`` under ``site``. Paging stops, keeping
+    the pages already yielded, as soon as the ``cancel`` event is set.
+    """
+    urls = [f"{url}?{urlencode(kwargs['params'])}" if kwargs.get("params") else url
+            for url, kwargs in page_requests]
+    site = site or (site_for_url(page_requests[0][0]) if page_requests else "unknown")
+    page_requests = page_requests[len(prefetched):]
+
+    def skip(page, reason):
+        metrics.record_skip(site)
+        if on_skip is not None:
+            on_skip(page, urls[page - 1], reason)
+
+    async def responses():
+        for response in prefetched:
+            yield response
+        wave = max(1, concurrency) if incremental else max(1, len(page_requests))
+        for start in range(0, len(page_requests), wave):
+            async with aclosing(iter_responses(page_requests[start:start + wave], concurrency,
+                                               cancel)) as wave_responses:
+                async for response in wave_responses:
+                    yield response
+
+    page_number = 0
+    pending = {}
+    async with aclosing(responses()) as stream:
+        async for response in stream:
+            if cancel is not None and cancel.is_set():
+                return
+            page_number += 1
+            if isinstance(response, Exception):
+                skip(page_number, str(response) or type(response).__name__)
+                continue
+            if response.status_code in RETRY_STATUSES:
+                skip(page_number, f"HTTP {response.status_code}")
+                continue
+            started = time.perf_counter()
+            try:
+                page = parse_response(response)
+            except StopPaging:
+                return
+            except Exception as e:
+                skip(page_number, f"unreadable page: {e}")
+                continue
+            metrics.record_page(site, time.perf_counter() - started, len(page))
+
+            if incremental:
+                fresh, rows = seen_listings.filter_new(page, pending)
+                if seen is not None:
+                    seen.extend(rows)
+                if not page.empty and fresh.empty:
+                    return
+                page = fresh
+            yield page
+
+def iter_async(agen):
+    """Drive an async generator from synchronous code, one item at a time"""
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+# Column order each site's results are sorted by
+SITE_SORT_KEYS = {}
+
+def to_site_frame(site, frames):
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if not df.empty:
+        df = df.sort_values(by=SITE_SORT_KEYS[site])
+    return df
+
+async def collect_site(site, page_batches):
+    return to_site_frame(site, [page async for page in page_batches])
+
+def scrape_pages(site, max_pages, incremental=False, on_skip=None, cancel=None, seen=None):
+    """Run a site's scraper as a generator yielding one DataFrame per fetched page"""
+    page_batches = iter_site_pages(site, max_pages, incremental=incremental, on_skip=on_skip, cancel=cancel,
+                                   seen=seen)
+    for page in iter_async(page_batches):
+        if not page.empty:
+            yield page
+
+# ========================
+# HTML PARSING
+# ========================
+def _has_class(*classes):
+    return " and ".join(f"contains(concat(' ', normalize-space(@class), ' '), ' {c} ')" for c in classes)
+
+# Every selector the HTML scrapers use, as (CSS for BeautifulSoup, XPath for lxml);
+# site definitions add their own when registered
+SELECTORS = {
+    "item.price": (".item-price", f".//*[{_has_class('item-price')}]"),
+    "item.title": (".item-title", f".//*[{_has_class('item-title')}]"),
+    "item.address": (".item-address", f".//*[{_has_class('item-address')}]"),
+    "item.link": (".item-title a", f".//*[{_has_class('item-title')}]//a"),
+    "detail.json_ld": ('script[type="application/ld+json"]', "//script[@type='application/ld+json']"),
+    "detail.description": ("#property-description-wrap .block-content-wrap, #property-description-wrap",
+                           "//*[@id='property-description-wrap']"),
+    "detail.meta_description": ('meta[property="og:description"], meta[name="description"]',
+                                "//meta[@property='og:description' or @name='description']"),
+    "detail.published": ('meta[property="article:published_time"], time[datetime]',
+                         "//meta[@property='article:published_time'] | //time[@datetime]"),
+    "detail.body": ("body", "//body")
+}
+
+class SoupParser:
+    """BeautifulSoup with html.parser and soupsieve selectors compiled once"""
+    name = "bs4"
+
+    def __init__(self):
+        import soupsieve
+        from bs4 import BeautifulSoup
+
+        self.soup = BeautifulSoup
+        self.selectors = {key: soupsieve.compile(css) for key, (css, _) in SELECTORS.items()}
+
+    def parse(self, content):
+        return self.soup(content, 'html.parser')
+
+    def select(self, node, key):
+        return self.selectors[key].select(node)
+
+    def select_one(self, node, key):
+        return self.selectors[key].select_one(node)
+
+    def text(self, node):
+        return node.text
+
+    def attr(self, node, name):
+        return node[name]
+
+class LxmlParser:
+    """libxml2 through lxml with XPath selectors compiled once"""
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        from lxml import etree
+
+        self.document_fromstring = lxml.html.document_fromstring
+        self.selectors = {key: etree.XPath(xpath) for key, (_, xpath) in SELECTORS.items()}
+
+    def parse(self, content):
+        # Listing pages are UTF-8; anything else falls back to libxml2's own detection
+        if isinstance(content, bytes):
+            try:
+                content = content.decode("utf-8")
+            except UnicodeDecodeError:
+                pass
+        return self.document_fromstring(content)
+
+    def select(self, node, key):
+        return self.selectors[key](node)
+
+    def select_one(self, node, key):
+        found = self.selectors[key](node)
+        return found[0] if found else None
+
+    def text(self, node):
+        return node.text_content()
+
+    def attr(self, node, name):
+        return node.attrib[name]
+
+HTML_PARSERS = {"bs4": SoupParser}
+if is_installed("lxml"):
+    HTML_PARSERS["lxml"] = LxmlParser
+
+# Fastest installed backend unless overridden
+PARSER_BACKEND = "lxml" if "lxml" in HTML_PARSERS else "bs4"
+
+_html_parsers = {}
+
+def get_html_parser(name=None):
+    """Return the (cached) HTML parser backend by name, defaulting to PARSER_BACKEND"""
+    name = name or PARSER_BACKEND
+    if name not in _html_parsers:
+        _html_parsers[name] = HTML_PARSERS[name]()
+    return _html_parsers[name]
+
+# ========================
+# SITE DEFINITIONS
+# ========================
+# A site is described, not coded: where its pages are, how they are numbered, where the
+# listings sit in each page and where every column comes from. One engine runs them all.
+
+REQUIRED = object()          # Field default meaning "skip the listing when this is missing"
+_MISSING = object()
+JSON_PATH_STEP = re.compile(r'^([^\[\]]+)(?:\[([^=\]]+)=([^\]]*)\])?$')
+PAGE_LINK_PATTERN = re.compile(r'/page/(\d+)/?')
+
+def compile_json_path(path):
+    """Compile a path like "adverts_list.adverts" or "attrs[name=Property size].value" into a getter.
+
+    ``[field=value]`` picks the first list item whose field equals value. The getter
+    returns _MISSING when any step is absent.
+    """
+    steps = []
+    for part in path.split("."):
+        match = JSON_PATH_STEP.match(part)
+        if match is None:
+            raise ValueError(f"Bad step {part!r} in JSON path {path!r}")
+        steps.append(match.groups())
+
+    def get(data):
+        for key, field, value in steps:
+            if not isinstance(data, dict) or key not in data:
+                return _MISSING
+            data = data[key]
+            if field is not None:
+                if not isinstance(data, list):
+                    return _MISSING
+                data = next((item for item in data if isinstance(item, dict) and item.get(field) == value),
+                            _MISSING)
+                if data is _MISSING:
+                    return _MISSING
+        return data
+    return get
+
+class SkipListing(Exception):
+    """Raised while extracting a listing that lacks a required field"""
+
+class Field:
+    """Where one listing column comes from: a JSON path, or an HTML selector key read as text or an attribute.
+
+    ``default`` is used when nothing is found (REQUIRED skips the listing instead), ``convert``
+    is applied to found values, ``template`` formats the result, and ``skip_empty`` skips
+    listings whose value is missing or empty.
+    """
+
+    def __init__(self, path, attr=None, default=REQUIRED, convert=None, template=None, skip_empty=False):
+        self.path = path
+        self.attr = attr
+        self.default = default
+        self.convert = convert
+        self.template = template
+        self.skip_empty = skip_empty
+        self._get = None
+
+    def compile(self, kind):
+        if kind == "json":
+            self._get = compile_json_path(self.path)
+        return self
+
+    def read(self, record, parser):
+        if self._get is not None:
+            return self._get(record)
+        element = parser.select_one(record, self.path)
+        if element is None:
+            return _MISSING
+        return parser.attr(element, self.attr) if self.attr else parser.text(element)
+
+    def extract(self, record, parser=None):
+        value = self.read(record, parser)
+        if value is _MISSING or (self.skip_empty and not value):
+            if self.skip_empty or self.default is REQUIRED:
+                raise SkipListing(self.path)
+            value = self.default
+        elif self.convert is not None:
+            value = self.convert(value)
+        return value if self.template is None else self.template.format(value)
+
+class SiteDefinition:
+    """A listing site for the scraper engine.
+
+    Pages are ``url`` with ``params``; page N adds ``page_param=N`` to the query, or
+    ``page_path`` (e.g. "page/{page}/") to the URL for pages after the first. When the site
+    says how many pages it has (``page_count_path`` in JSON, or ``page_links`` in HTML
+    pagination), page 1 is fetched first to read it. ``records`` is the JSON path or selector
+    key of the listings in a page, and ``fields`` maps listing columns to Fields.
+    """
+
+    def __init__(self, name, label, source, url, kind, records, fields, params=None, page_param=None,
+                 page_path=None, page_count_path=None, page_links=None, headers=None, timeout=10, verify=True,
+                 concurrency=4, rate_limit=None, sort_by="Size (sqm)", currency="ETB", clean_size=True,
+                 stop_on_error=False, selectors=None):
+        self.name = name
+        self.label = label
+        self.source = source
+        self.url = url
+        self.host = _host(url)
+        self.kind = kind
+        self.records_path = records
+        self.fields = {column: field.compile(kind) for column, field in fields.items()}
+        self.params = params or {}
+        self.page_param = page_param
+        self.page_path = page_path
+        self._page_count = compile_json_path(page_count_path) if page_count_path else None
+        self.page_count_path = page_count_path
+        self.page_links = page_links
+        self.headers = headers or HEADERS
+        self.timeout = timeout
+        self.verify = verify
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit or DEFAULT_RATE_LIMIT
+        self.sort_by = sort_by
+        self.currency = currency
+        self.clean_size = clean_size
+        # Any failure ends the run for the site, as an error page means later pages fail too
+        self.stop_on_error = stop_on_error
+        self.selectors = selectors or {}
+        self._records = compile_json_path(records) if kind == "json" else None
+
+    @property
+    def discovers_pages(self):
+        return self._page_count is not None or self.page_links is not None
+
+    def page_request(self, page):
+        """(url, request options) for one page"""
+        url = self.url
+        if self.page_path and page > 1:
+            url = url + self.page_path.format(page=page)
+        options = {"headers": self.headers, "timeout": self.timeout}
+        if self.params or self.page_param:
+            options["params"] = {**self.params, **({self.page_param: page} if self.page_param else {})}
+        if not self.verify:
+            options["verify"] = False
+        return url, options
+
+    def page_count(self, response, parser=None):
+        """Pages the site has, as told by a fetched first page (1 when it does not say)"""
+        if self._page_count is not None:
+            found = self._page_count(response.json())
+            return 1 if found is _MISSING or found is None else int(found)
+        parser = parser or get_html_parser()
+        pages = [1]
+        for link in parser.select(parser.parse(response.content), self.page_links):
+            try:
+                match = PAGE_LINK_PATTERN.search(parser.attr(link, 'href'))
+            except KeyError:
+                continue
+            if match:
+                pages.append(int(match.group(1)))
+        return max(pages)
+
+    def records(self, document, parser=None):
+        if self._records is not None:
+            found = self._records(document)
+            return [] if found is _MISSING or found is None else found
+        return parser.select(document, self.records_path)
+
+    def parse(self, document, parser=None):
+        """Listing frame from a decoded page: parsed JSON, or an HTML tree from ``parser``"""
+        raw = []
+        for record in self.records(document, parser):
+            try:
+                entry = {column: field.extract(record, parser) for column, field in self.fields.items()}
+            except Exception:
+                # Missing required fields, or markup the selectors do not expect
+                continue
+            entry["Source"] = self.source
+            raw.append(entry)
+        return normalize_listings(raw, self.currency, clean_size=self.clean_size)
+
+    def parse_page(self, content, parser=None):
+        """Listing frame from a page body as downloaded"""
+        if self.kind == "json":
+            return self.parse(json.loads(content))
+        parser = parser or get_html_parser()
+        return self.parse(parser.parse(content), parser)
+
+    def parse_response(self, response):
+        if not self.stop_on_error:
+            return self.parse(response.json()) if self.kind == "json" else self.parse_page(response.content)
+        try:
+            if response.status_code != 200:
+                print(f"Stopped at {response.url}. Status code: {response.status_code}")
+                raise StopPaging()
+            document = response.json() if self.kind == "json" else get_html_parser().parse(response.content)
+            if not self.records(document, get_html_parser()):
+                raise StopPaging()
+            return self.parse(document, get_html_parser())
+        except StopPaging:
+            raise
+        except Exception as e:
+            print(f"Error occurred: {str(e)}")
+            raise StopPaging()
+
+# Site name -> SiteDefinition, in the order sites are run and listed
+SITE_DEFINITIONS = {}
+
+def register_site(definition):
+    """Add a site to the registry, and its limits to the tables the fetch layer reads"""
+    SITE_DEFINITIONS[definition.name] = definition
+    if definition.name not in SITES:
+        SITES.append(definition.name)
+    SITE_HOSTS[definition.name] = definition.host
+    SITE_CONCURRENCY[definition.name] = definition.concurrency
+    POOL_SIZES[definition.host] = max(POOL_SIZES.get(definition.host, 0), definition.concurrency)
+    RATE_LIMITS[definition.name] = dict(definition.rate_limit)
+    SITE_SORT_KEYS[definition.name] = definition.sort_by
+    if definition.selectors:
+        SELECTORS.update(definition.selectors)
+        # Parser backends compile every selector when they are created
+        _html_parsers.clear()
+    globals()[f"scrape_{definition.name}"] = _sync_scraper(definition)
+    return definition
+
+def _sync_scraper(definition):
+    # scrape_<name>(max_pages), the synchronous entry point each site has always had
+    def scrape(max_pages, incremental=False):
+        return scrape_site(definition.name, max_pages, incremental)
+    scrape.__name__ = scrape.__qualname__ = f"scrape_{definition.name}"
+    scrape.__doc__ = f"Every listing of the first ``max_pages`` {definition.label} pages, as one frame"
+    return scrape
+
+LIVINGETHIO_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "application/json",
+    "Referer": "https://livingethio.com/"
+}
+
+register_site(SiteDefinition(
+    name="jiji", label="Jiji", source="Jiji", kind="json",
+    url="https://jiji.com.et/api_web/v1/listing",
+    params={"slug": "houses-apartments-for-sale", "webp": "true", "filter_attr_188_property_type": "House"},
+    page_param="page",
+    records="adverts_list.adverts",
+    fields={
+        "Title": Field("title", default="N/A"),
+        "Price": Field("price_obj.value", default="N/A", convert=str),
+        "Location": Field("region_name", default="N/A"),
+        "Size (sqm)": Field("attrs[name=Property size].value", default="0"),
+        "Link": Field("url", default="", template="https://jiji.com.et{}")
+    },
+    concurrency=8, rate_limit={"rate": 4.0, "burst": 8, "max_rate": 16.0},
+    sort_by=["Location", "Size (sqm)"]
+))
+
+register_site(SiteDefinition(
+    name="realethio", label="Realethio", source="Realethio", kind="html",
+    url="https://realethio.com/property-type/house-for-sale/",
+    page_path="page/{page}/",
+    records="realethio.card",
+    fields={
+        "Title": Field("item.title"),
+        "Price": Field("item.price"),
+        "Location": Field("item.address"),
+        "Size (sqm)": Field("realethio.size", default="0", convert=lambda text: text.split('m²')[0]),
+        "Link": Field("item.link", attr="href")
+    },
+    selectors={
+        "realethio.card": (".item-listing-wrap", f"//*[{_has_class('item-listing-wrap')}]"),
+        "realethio.size": ("li:-soup-contains('m²')", ".//li[contains(., 'm²')]")
+    },
+    concurrency=4, rate_limit={"rate": 2.0, "burst": 4, "max_rate": 8.0}
+))
+
+register_site(SiteDefinition(
+    name="ethiopiarealty", label="EthiopiaRealty", source="EthiopiaRealty", kind="html",
+    url="https://ethiopiarealty.com/building-for-sale/",
+    page_path="page/{page}/",
+    # Page 1's pagination widget gives the page count; later pages are fetched concurrently
+    page_links="ethiopiarealty.page_link",
+    records="ethiopiarealty.card",
+    fields={
+        "Title": Field("item.title"),
+        "Price": Field("item.price"),
+        "Location": Field("item.address", convert=lambda text: text.replace(" ,", ",")),
+        "Size (sqm)": Field("ethiopiarealty.size", default="0"),
+        "Link": Field("item.link", attr="href")
+    },
+    selectors={
+        "ethiopiarealty.card": ("div.d-flex.align-items-center.h-100",
+                                f"//div[{_has_class('d-flex', 'align-items-center', 'h-100')}]"),
+        "ethiopiarealty.size": (".hz-figure", f".//*[{_has_class('hz-figure')}]"),
+        "ethiopiarealty.page_link": (".pagination a.page-link",
+                                     f"//*[{_has_class('pagination')}]//a[{_has_class('page-link')}]")
+    },
+    concurrency=4, rate_limit={"rate": 2.0, "burst": 4, "max_rate": 8.0}
+))
+
+register_site(SiteDefinition(
+    name="livingethio", label="Living Ethio", source="Living Ethio", kind="json",
+    url="https://18.223.203.43.nip.io/api/properties/findByCategoryPagination/house-for-sale",
+    params={"limit": 100}, page_param="page",
+    # The first page tells us how many pages exist; the rest are fetched together
+    page_count_path="totalPages",
+    records="records",
+    fields={
+        "Title": Field("title", default="N/A"),
+        "Price": Field("price", default=None, convert=str),
+        "Location": Field("location.name", default="N/A"),
+        # Listings without an area are left out
+        "Size (sqm)": Field("area", skip_empty=True),
+        "Link": Field("id", default="", template="https://livingethio.com/site/property-details/{}")
+    },
+    headers=LIVINGETHIO_HEADERS, timeout=15, verify=False, clean_size=False, stop_on_error=True,
+    concurrency=2, rate_limit={"rate": 1.0, "burst": 2, "max_rate": 4.0},
+    sort_by=["Location", "Size (sqm)"]
+))
+
+async def iter_site_pages(site, max_pages, concurrency=None, incremental=False, on_skip=None, cancel=None,
+                          seen=None):
+    """Yield a registered site's listing frames page by page, up to ``max_pages`` pages"""
+    definition = SITE_DEFINITIONS[site]
+    prefetched = []
+    last_page = max_pages
+    if definition.discovers_pages:
+        first_response = (await fetch_all([definition.page_request(1)], 1, cancel))[0]
+        prefetched = [first_response]
+        try:
+            last_page = min(definition.page_count(first_response), max_pages)
+        except Exception:
+            last_page = 1
+
+    page_requests = [definition.page_request(page) for page in range(1, max(last_page, len(prefetched)) + 1)]
+    async with aclosing(iter_pages(page_requests, concurrency or definition.concurrency,
+                                   definition.parse_response, incremental, prefetched=prefetched,
+                                   on_skip=on_skip, site=site, cancel=cancel, seen=seen)) as pages:
+        async for page in pages:
+            yield page
+
+def run_sync(coroutine):
+    """Run a coroutine to completion from synchronous code.
+
+    Inside a running event loop (e.g. a Jupyter cell) asyncio.run refuses to start, so the
+    coroutine then runs on a worker thread with a loop of its own.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+def scrape_site(site, max_pages, incremental=False):
+    """Every listing of a registered site's first ``max_pages`` pages, as one frame"""
+    seen = []
+    df = run_sync(collect_site(site, iter_site_pages(site, max_pages, incremental=incremental, seen=seen)))
+    seen_listings.remember(seen)
+    return df
+
+# ========================
+# CONCURRENT RUNNER
+# ========================
+DEFAULT_MAX_WORKERS = 4
+
+def iter_site_results(sites_pages, max_workers=DEFAULT_MAX_WORKERS, incremental=False, on_page=None,
+                      on_skip=None, cancel=None, seen=None):
+    """Run each site's scraper in its own worker, yielding (site, df, error) as each one finishes.
+
+    ``on_page(site, df)`` is called from the worker threads with every page as it is parsed,
+    and ``on_skip(site, page, url, reason)`` with every page given up on. Setting ``cancel``
+    (a threading.Event) stops every site at its next page; each still yields what it has.
+    In incremental mode the fingerprints of the pages read are collected in ``seen``;
+    pass them to seen_listings.remember() after the results are written.
+    """
+    jobs = {site: pages for site, pages in sites_pages.items() if pages > 0}
+    if not jobs:
+        return
+    # Hosts that failed in an earlier run get another chance
+    reset_circuit_breakers()
+
+    def run_site(site, pages):
+        frames = []
+        skipped = None
+        if on_skip is not None:
+            skipped = lambda page, url, reason: on_skip(site, page, url, reason)
+        for df in scrape_pages(site, pages, incremental=incremental, on_skip=skipped, cancel=cancel, seen=seen):
+            frames.append(df)
+            if on_page is not None:
+                on_page(site, df)
+        return to_site_frame(site, frames)
+
+    # Finish the lazy imports here; LazyLoader is not safe to trigger from several threads at once
+    pd.DataFrame, np.ndarray, requests.Session
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as executor:
+        futures = {}
+        for site, pages in jobs.items():
+            if site not in SITE_DEFINITIONS:
+                yield site, pd.DataFrame(), f"No scraper found for {site}"
+                continue
+            futures[executor.submit(run_site, site, pages)] = site
+
+        for future in as_completed(futures):
+            site = futures[future]
+            try:
+                yield site, future.result(), None
+            except Exception as e:
+                yield site, pd.DataFrame(), str(e)
+
+# ========================
+# CROSS-SOURCE DEDUPLICATION
+# ========================
+SIZE_TOLERANCE = 0.10        # sizes within 10% of each other can be the same property
+PRICE_TOLERANCE = 0.05
+TITLE_SIMILARITY = 0.8       # SequenceMatcher ratio of the normalized titles,
+TITLE_OVERLAP = 0.4          # checked only when this share of their words is common to both
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+NUMBER_TOKEN_PATTERN = re.compile(r'(?<![^\W_])\d+(?![^\W_])')
+# Words that say nothing about which property or which neighbourhood it is
+GENERIC_LOCATION_WORDS = {"addis", "ababa", "aa", "ethiopia", "city", "sub", "subcity", "area", "around", "near"}
+GENERIC_TITLE_WORDS = {"for", "sale", "in", "at", "the", "a", "an", "and", "with", "new", "house", "home", "property"}
+# Neighbouring (size, price) buckets to compare each block with; half the 3x3 neighbourhood
+# so every pair of adjacent blocks is visited once
+NEIGHBOUR_BLOCKS = [(0, 0), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+def _buckets(values, tolerance):
+    """Log-scale bucket per value, so values within tolerance land in the same or an adjacent bucket"""
+    values = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64", na_value=float("nan"))
+    valid = values > 0
+    buckets = np.full(len(values), -1, dtype="int64")
+    buckets[valid] = np.floor(np.log(values[valid]) / np.log1p(tolerance)).astype("int64")
+    return values, buckets
+
+def _title_words(title):
+    words = {t for t in TOKEN_PATTERN.findall(str(title).lower()) if t not in GENERIC_TITLE_WORDS}
+    return words, {t for t in words if t.isdigit()}, " ".join(sorted(words))
+
+def _similar_titles(title_a, title_b):
+    """Same numbers (floors, bedrooms), enough shared words, then a fuzzy match of the words"""
+    (words_a, numbers_a, text_a), (words_b, numbers_b, text_b) = title_a, title_b
+    if numbers_a and numbers_b and numbers_a != numbers_b:
+        return False
+    if len(words_a & words_b) < TITLE_OVERLAP * len(words_a | words_b):
+        return False
+    text_a, text_b = sorted((text_a, text_b))
+    matcher = SequenceMatcher(None, text_a, text_b, autojunk=False)
+    return matcher.quick_ratio() >= TITLE_SIMILARITY and matcher.ratio() >= TITLE_SIMILARITY
+
+def _close(a, b, tolerance):
+    """Both missing, or both present and within tolerance of the larger"""
+    missing_a, missing_b = ~(a > 0), ~(b > 0)
+    with np.errstate(invalid="ignore"):
+        near = np.abs(a - b) <= tolerance * np.maximum(a, b)
+    return (missing_a & missing_b) | (~missing_a & ~missing_b & near)
+
+def find_duplicate_pairs(df):
+    """Row-position pairs of listings from different sources that look like the same property.
+
+    Listings are blocked by location word, size bucket and price bucket; only listings in
+    the same or adjacent blocks are compared, on size, price and a fuzzy title match.
+    """
+    count = len(df)
+    sizes, size_buckets = _buckets(df["Size (sqm)"], SIZE_TOLERANCE)
+    prices, price_buckets = _buckets(df["Price"], PRICE_TOLERANCE)
+    sources = df["Source"].astype(str).to_numpy()
+    # A missing title or location (JSON null) reads as empty text
+    title_text = df["Title"].fillna("").astype(str)
+    # Titles that both carry numbers (floors, bedrooms) must carry the same ones
+    numbers = (title_text.str.findall(NUMBER_TOKEN_PATTERN.pattern)
+               .map(lambda found: hash(frozenset(found)) if found else 0).to_numpy(dtype="int64"))
+
+    # One index entry per (row, location word); rows without a usable word share the "" block
+    words = (df["Location"].fillna("").astype(str).str.lower().str.findall(TOKEN_PATTERN.pattern)
+             .map(lambda found: sorted(set(found) - GENERIC_LOCATION_WORDS) or [""]))
+    entries = pd.DataFrame({"row": np.arange(count), "word": words.to_numpy(),
+                            "size": size_buckets, "price": price_buckets}).explode("word")
+
+    # Join the index with itself once per neighbouring block offset
+    lefts, rights = [], []
+    for size_step, price_step in NEIGHBOUR_BLOCKS:
+        shifted = entries.assign(size=entries["size"] - size_step, price=entries["price"] - price_step)
+        joined = entries.merge(shifted, on=["word", "size", "price"], suffixes=("", "_other"))
+        left, right = joined["row"].to_numpy(), joined["row_other"].to_numpy()
+        keep = left < right if (size_step, price_step) == (0, 0) else left != right
+        lefts.append(left[keep])
+        rights.append(right[keep])
+    left, right = np.concatenate(lefts), np.concatenate(rights)
+    left, right = np.minimum(left, right), np.maximum(left, right)
+
+    keep = ((sources[left] != sources[right])
+            & ((numbers[left] == numbers[right]) | (numbers[left] == 0) | (numbers[right] == 0))
+            & _close(sizes[left], sizes[right], SIZE_TOLERANCE)
+            & _close(prices[left], prices[right], PRICE_TOLERANCE))
+    # A pair can be found through several shared location words
+    candidates = np.unique(left[keep] * count + right[keep])
+
+    raw_titles = title_text.tolist()
+    titles = {}
+    # Generic titles repeat a lot; compare each distinct pair of titles once
+    verdicts = {}
+    pairs = set()
+    for key in candidates.tolist():
+        a, b = divmod(key, count)
+        for row in (a, b):
+            if row not in titles:
+                titles[row] = _title_words(raw_titles[row])
+        texts = (titles[a][2], titles[b][2])
+        if texts not in verdicts:
+            verdicts[texts] = _similar_titles(titles[a], titles[b])
+        if verdicts[texts]:
+            pairs.add((a, b))
+    return pairs
+
+def listing_ids(df):
+    """Stable ID per listing, from its Source and Link"""
+    keys = df["Source"].astype(str) + "|" + df["Link"].astype(str)
+    return [hashlib.sha1(key.encode("utf-8")).hexdigest()[:12] for key in keys]
+
+def dedupe_listings(df):
+    """Tag every listing with a "Listing ID" shared by all copies of the same property.
+
+    The ID of a cluster is that of its member with the smallest ID, so it does not depend
+    on the order the sites finished in. Rows are kept; drop_duplicate_listings() removes copies.
+    """
+    df = df.reset_index(drop=True)
+    if df.empty:
+        return df.assign(**{"Listing ID": pd.Series(dtype="object")})
+
+    ids = listing_ids(df)
+    parent = list(range(len(df)))
+
+    def find(row):
+        while parent[row] != row:
+            parent[row] = parent[parent[row]]
+            row = parent[row]
+        return row
+
+    for a, b in find_duplicate_pairs(df):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            # The member with the smallest ID becomes the root, and its ID the cluster's
+            if ids[root_b] < ids[root_a]:
+                root_a, root_b = root_b, root_a
+            parent[root_b] = root_a
+    return df.assign(**{"Listing ID": [ids[find(row)] for row in range(len(df))]})
+
+def drop_duplicate_listings(df):
+    """Keep one listing per "Listing ID", tagging the frame first if needed"""
+    if "Listing ID" not in df.columns:
+        df = dedupe_listings(df)
+    return df.drop_duplicates(subset="Listing ID").reset_index(drop=True)
+
+# ========================
+# SEARCH INDEX
+# ========================
+SEARCH_COLUMNS = ["Title", "Location"]
+RANGE_COLUMNS = ["Price", "Size (sqm)"]
+AMOUNT_PATTERN = re.compile(r'^(\d+(?:\.\d+)?)([km]?)$')
+AMOUNT_MULTIPLIERS = {"": 1, "k": 1e3, "m": 1e6}
+
+def parse_amount(text):
+    """Filter bound as typed, e.g. "250", "1,500,000" or "10M"; None when blank or unreadable"""
+    match = AMOUNT_PATTERN.match(str(text).strip().lower().replace(",", "").replace(" ", ""))
+    if not match:
+        return None
+    return float(match.group(1)) * AMOUNT_MULTIPLIERS[match.group(2)]
+
+class ListingIndex:
+    """Lowercase word index over Title and Location, and sorted Price and Size arrays, for one frame.
+
+    Built once; every query is then a few slices and binary searches returning a row mask.
+    """
+    def __init__(self, df):
+        df = df.reset_index(drop=True)
+        self.length = len(df)
+        text = df[SEARCH_COLUMNS[0]].fillna("").astype(str)
+        for column in SEARCH_COLUMNS[1:]:
+            text = text + " " + df[column].fillna("").astype(str)
+        entries = text.str.lower().str.findall(TOKEN_PATTERN.pattern).explode().dropna()
+        codes, vocabulary = pd.factorize(entries.to_numpy())
+        # Number the words alphabetically, so words sharing a prefix are adjacent
+        ranks = np.argsort(np.argsort(vocabulary.astype(str)))
+        self.words = sorted(vocabulary.astype(str).tolist())
+        # One sorted (word, row) key per distinct pair; each word's rows are then one contiguous slice
+        stride = max(self.length, 1)
+        keys = np.unique(ranks[codes] * stride + entries.index.to_numpy(dtype="int64"))
+        self.rows = keys % stride
+        self.offsets = np.searchsorted(keys // stride, np.arange(len(self.words) + 1))
+
+        self.ranges = {}
+        for column in RANGE_COLUMNS:
+            values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype="float64", na_value=float("nan"))
+            # Zero is how a missing size is stored; it never falls inside a range
+            known = np.flatnonzero(values > 0)
+            order = known[np.argsort(values[known], kind="stable")]
+            self.ranges[column] = (values[order], order)
+
+    def word_rows(self, prefix):
+        """Rows with a word starting with ``prefix``"""
+        first = bisect.bisect_left(self.words, prefix)
+        last = bisect.bisect_left(self.words, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+        return self.rows[self.offsets[first]:self.offsets[last]]
+
+    def range_rows(self, column, low=None, high=None):
+        """Rows whose ``column`` is between ``low`` and ``high``, both inclusive and optional"""
+        values, order = self.ranges[column]
+        first = 0 if low is None else np.searchsorted(values, low, side="left")
+        last = len(values) if high is None else np.searchsorted(values, high, side="right")
+        return order[first:last]
+
+    def match(self, text="", ranges=None):
+        """Boolean row mask for rows holding every word of ``text`` and inside every (low, high) range.
+
+        The last word may still be being typed, so each word matches as a prefix. None means no filter.
+        """
+        selections = [self.word_rows(word) for word in dict.fromkeys(TOKEN_PATTERN.findall(str(text).lower()))]
+        for column, (low, high) in (ranges or {}).items():
+            if low is not None or high is not None:
+                selections.append(self.range_rows(column, low, high))
+        if not selections:
+            return None
+        # Fancy-index += counts a row once per selection, even when a prefix matched it twice
+        counts = np.zeros(self.length, dtype="int64")
+        for rows in selections:
+            counts[rows] += 1
+        return counts == len(selections)
+
+# ========================
+# DETAIL ENRICHMENT
+# ========================
+DETAILS_PATH = os.path.join(DATA_DIR, "listing_details.sqlite")
+DETAIL_COLUMNS = ["Bedrooms", "Posted", "Description"]
+DETAIL_WORKERS = 8           # detail pages in flight at once, across all hosts
+BEDROOMS_PATTERN = re.compile(r'(\d{1,2})\s*(?:bed(?:room)?s?|BR)\b|bed(?:room)?s?\s*[:\-]?\s*(\d{1,2})\b',
+                              re.IGNORECASE)
+
+def _json_ld_fields(texts):
+    """Bedrooms, posting date and description from schema.org JSON-LD blocks"""
+    found = {}
+    stack = []
+    for text in texts:
+        try:
+            stack.append(json.loads(text))
+        except ValueError:
+            continue
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, dict):
+            stack.extend(value for value in item.values() if isinstance(value, (list, dict)))
+            # numberOfRooms counts every room, not bedrooms, so it is not used
+            for key, field in (("numberOfBedrooms", "Bedrooms"),
+                               ("datePosted", "Posted"), ("datePublished", "Posted"),
+                               ("description", "Description")):
+                value = item.get(key)
+                if isinstance(value, (str, int, float)) and field not in found:
+                    found[field] = value
+    return found
+
+def parse_listing_detail(content, parser=None):
+    """Bedrooms, posting date and description from a listing's detail page.
+
+    Uses schema.org JSON-LD where the page has it, then the Houzez description block,
+    OpenGraph/meta tags and <time> elements; bedrooms fall back to the page text.
+    """
+    parser = parser or get_html_parser()
+    root = parser.parse(content)
+    detail = _json_ld_fields(parser.text(node) for node in parser.select(root, "detail.json_ld"))
+
+    if "Description" not in detail:
+        node = parser.select_one(root, "detail.description")
+        if node is not None:
+            detail["Description"] = parser.text(node)
+        else:
+            node = parser.select_one(root, "detail.meta_description")
+            if node is not None:
+                detail["Description"] = parser.attr(node, "content")
+    if "Posted" not in detail:
+        node = parser.select_one(root, "detail.published")
+        if node is not None:
+            try:
+                detail["Posted"] = parser.attr(node, "content")
+            except KeyError:
+                detail["Posted"] = parser.attr(node, "datetime")
+    if "Bedrooms" not in detail:
+        body = parser.select_one(root, "detail.body")
+        match = BEDROOMS_PATTERN.search(WHITESPACE_PATTERN.sub(" ", parser.text(body if body is not None else root)))
+        if match:
+            detail["Bedrooms"] = match.group(1) or match.group(2)
+
+    try:
+        bedrooms = int(float(detail.get("Bedrooms")))
+    except (TypeError, ValueError):
+        bedrooms = None
+    return {
+        "Bedrooms": bedrooms,
+        "Posted": str(detail["Posted"]) if detail.get("Posted") else None,
+        "Description": clean_text(str(detail["Description"])) if detail.get("Description") else None
+    }
+
+class DetailCache:
+    """Persisted Link -> detail fields, so enriched listings are not fetched again"""
+
+    def __init__(self, path=DETAILS_PATH):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS details (
+                    link TEXT PRIMARY KEY,
+                    bedrooms INTEGER,
+                    posted TEXT,
+                    description TEXT,
+                    fetched_at REAL
+                )""")
+        return self._conn
+
+    def get_many(self, links):
+        """Cached details for whichever of the links have them"""
+        found = {}
+        links = list(links)
+        with self._lock:
+            conn = self._connect()
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(links), 500):
+                chunk = links[start:start + 500]
+                rows = conn.execute(f"SELECT link, bedrooms, posted, description FROM details "
+                                    f"WHERE link IN ({', '.join('?' * len(chunk))})", chunk)
+                for link, bedrooms, posted, description in rows:
+                    found[link] = {"Bedrooms": bedrooms, "Posted": posted, "Description": description}
+        return found
+
+    def put(self, link, detail):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO details VALUES (?, ?, ?, ?, ?)",
+                         (link, detail["Bedrooms"], detail["Posted"], detail["Description"], time.time()))
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM details")
+            conn.commit()
+
+detail_cache = DetailCache()
+
+def fetch_listing_detail(link, cancel=None):
+    """Download and parse one detail page; None when it cannot be fetched"""
+    response = fetch(link, headers=HEADERS, timeout=10, cancel=cancel)
+    if response.status_code != 200:
+        return None
+    return parse_listing_detail(response.content)
+
+def enrich_listings(df, max_workers=DETAIL_WORKERS, on_progress=None, cancel=None):
+    """Add Bedrooms, Posted and Description columns from each listing's detail page.
+
+    Links already in the detail cache are not fetched again; the rest are fetched by a
+    bounded worker pool (each request still goes through the host's rate limiter).
+    ``on_progress(done, total)`` is called from the calling thread as pages complete.
+    Listings whose page fails keep empty detail fields and are retried on the next run.
+    Setting ``cancel`` stops fetching; listings not fetched yet keep empty detail fields.
+    """
+    df = df.copy()
+    if df.empty or "Link" not in df.columns:
+        for column in DETAIL_COLUMNS:
+            df[column] = pd.Series(dtype="object")
+        return df
+
+    links = [link for link in pd.unique(df["Link"]) if isinstance(link, str) and link.startswith("http")]
+    details = detail_cache.get_many(links)
+    missing = [link for link in links if link not in details]
+
+    if missing:
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing))))
+        futures = {executor.submit(fetch_listing_detail, link, cancel): link for link in missing}
+        pending = set(futures)
+        done = 0
+        try:
+            # Woken every CANCEL_POLL seconds, so a cancel is noticed while every worker is waiting
+            while pending and not (cancel is not None and cancel.is_set()):
+                finished, pending = wait_futures(pending, timeout=CANCEL_POLL, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    link = futures[future]
+                    try:
+                        detail = future.result()
+                    except Exception:
+                        detail = None
+                    if detail is not None:
+                        details[link] = detail
+                        detail_cache.put(link, detail)
+                    done += 1
+                    if on_progress is not None:
+                        on_progress(done, len(missing))
+        finally:
+            # After a cancel, requests still on their way are not waited for
+            executor.shutdown(wait=cancel is None or not cancel.is_set(), cancel_futures=True)
+
+    for column in DETAIL_COLUMNS:
+        df[column] = df["Link"].map(lambda link: details.get(link, {}).get(column))
+    df["Bedrooms"] = pd.to_numeric(df["Bedrooms"], errors="coerce").astype("Int64")
+    df["Posted"] = pd.to_datetime(df["Posted"], errors="coerce", utc=True, format="mixed").dt.tz_localize(None)
+    return df
+
+# ========================
+# LISTING STORE
+# ========================
+STORE_PATH = os.path.join(DATA_DIR, "listings.sqlite")
+STORE_BATCH_SIZE = 10000     # rows staged per executemany call
+
+# Frame column -> store column; detail and ID columns are optional in a frame
+STORE_COLUMNS = {
+    "Source": "source",
+    "Link": "link",
+    "Title": "title",
+    "Price": "price",
+    "Currency": "currency",
+    "Location": "location",
+    "Size (sqm)": "size",
+    "Listing ID": "listing_id",
+    "Bedrooms": "bedrooms",
+    "Posted": "posted",
+    "Description": "description"
+}
+
+class ListingStore:
+    """Every listing ever scraped, keyed by (Source, Link), with a history of price and size changes"""
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA cache_size=-65536")  # 64 MB of page cache for the indexes
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS listings (
+                    source TEXT NOT NULL,
+                    link TEXT NOT NULL,
+                    title TEXT,
+                    price REAL,
+                    currency TEXT,
+                    location TEXT COLLATE NOCASE,
+                    size REAL,
+                    listing_id TEXT,
+                    bedrooms INTEGER,
+                    posted TEXT,
+                    description TEXT,
+                    first_seen REAL,
+                    last_seen REAL,
+                    PRIMARY KEY (source, link)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_listings_location ON listings (location);
+                CREATE INDEX IF NOT EXISTS idx_listings_price ON listings (price);
+                CREATE INDEX IF NOT EXISTS idx_listings_size ON listings (size);
+                CREATE INDEX IF NOT EXISTS idx_listings_listing_id ON listings (listing_id);
+                CREATE TABLE IF NOT EXISTS price_history (
+                    source TEXT NOT NULL,
+                    link TEXT NOT NULL,
+                    price REAL,
+                    size REAL,
+                    recorded_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_price_history_listing ON price_history (source, link, recorded_at);
+            """)
+        return self._conn
+
+    @staticmethod
+    def _rows(df):
+        """Frame rows as tuples in STORE_COLUMNS order, with NaN/NaT turned into NULL"""
+        columns = {}
+        for column in STORE_COLUMNS:
+            if column not in df.columns:
+                columns[column] = [None] * len(df)
+                continue
+            values = df[column]
+            if pd.api.types.is_datetime64_any_dtype(values):
+                values = values.dt.strftime("%Y-%m-%d")
+            columns[column] = values.astype(object).where(values.notna(), None).tolist()
+        return list(zip(*columns.values()))
+
+    def upsert(self, df):
+        """Insert or update listings in batches; returns how many were new or changed price/size"""
+        if df.empty:
+            return 0
+        rows = self._rows(df)
+        names = ", ".join(STORE_COLUMNS.values())
+        now = time.time()
+        changed = 0
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS staging ({names})")
+                for start in range(0, len(rows), STORE_BATCH_SIZE):
+                    conn.execute("DELETE FROM staging")
+                    conn.executemany(f"INSERT INTO staging VALUES ({', '.join('?' * len(STORE_COLUMNS))})",
+                                     rows[start:start + STORE_BATCH_SIZE])
+                    # History first, while the listings table still holds the old values
+                    changed += conn.execute("""
+                        INSERT INTO price_history (source, link, price, size, recorded_at)
+                        SELECT s.source, s.link, s.price, s.size, ?
+                        FROM staging s LEFT JOIN listings l ON l.source = s.source AND l.link = s.link
+                        WHERE l.link IS NULL OR l.price IS NOT s.price OR l.size IS NOT s.size""",
+                        (now,)).rowcount
+                    # Details and IDs from an earlier run are kept when this run has none
+                    conn.execute(f"""
+                        INSERT INTO listings ({names}, first_seen, last_seen)
+                        SELECT {names}, ?, ? FROM staging WHERE true ORDER BY source, link
+                        ON CONFLICT (source, link) DO UPDATE SET
+                            title = excluded.title,
+                            price = excluded.price,
+                            currency = excluded.currency,
+                            location = excluded.location,
+                            size = excluded.size,
+                            listing_id = COALESCE(excluded.listing_id, listing_id),
+                            bedrooms = COALESCE(excluded.bedrooms, bedrooms),
+                            posted = COALESCE(excluded.posted, posted),
+                            description = COALESCE(excluded.description, description),
+                            last_seen = excluded.last_seen""", (now, now))
+                conn.execute("DROP TABLE staging")
+        return changed
+
+    def load(self, sources=None, location=None, min_price=None, max_price=None,
+             min_size=None, max_size=None, limit=None):
+        """Stored listings as a listing frame, optionally filtered (each filter can use an index).
+
+        ``location`` matches locations starting with it, ignoring case.
+        """
+        clauses, params = [], []
+        if sources:
+            clauses.append(f"source IN ({', '.join('?' * len(sources))})")
+            params.extend(sources)
+        if location:
+            # A prefix match, so the location index can serve it
+            clauses.append("location LIKE ?")
+            params.append(location.replace("%", "").replace("_", "") + "%")
+        for column, bound, operator in (("price", min_price, ">="), ("price", max_price, "<="),
+                                        ("size", min_size, ">="), ("size", max_size, "<=")):
+            if bound is not None:
+                clauses.append(f"{column} {operator} ?")
+                params.append(bound)
+        query = f"SELECT {', '.join(STORE_COLUMNS.values())} FROM listings"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY source, link"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            cursor = self._connect().execute(query, params)
+            rows = cursor.fetchall()
+        df = pd.DataFrame(rows, columns=list(STORE_COLUMNS), dtype=object)
+        df["Price"] = pd.to_numeric(df["Price"], errors="coerce").astype("float64")
+        df["Size (sqm)"] = pd.to_numeric(df["Size (sqm)"], errors="coerce").astype("float64")
+        df["Currency"] = pd.Categorical(df["Currency"], categories=CURRENCIES)
+        df["Bedrooms"] = pd.to_numeric(df["Bedrooms"], errors="coerce").astype("Int64")
+        df["Posted"] = pd.to_datetime(df["Posted"], errors="coerce")
+        # Detail columns only when some stored listing was enriched
+        empty = [column for column in DETAIL_COLUMNS if df[column].isna().all()]
+        return df[LISTING_COLUMNS + ["Currency", "Listing ID"] + [c for c in DETAIL_COLUMNS if c not in empty]]
+
+    def history(self, source, link):
+        """Price and size of one listing each time it changed, oldest first"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT price, size, recorded_at FROM price_history WHERE source = ? AND link = ? "
+                "ORDER BY recorded_at", (source, link)).fetchall()
+        df = pd.DataFrame(rows, columns=["Price", "Size (sqm)", "Recorded"])
+        df["Recorded"] = pd.to_datetime(df["Recorded"], unit="s")
+        return df
+
+    def count(self):
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM listings")
+                conn.execute("DELETE FROM price_history")
+
+listing_store = ListingStore()
+
+# ========================
+# EXPORT
+# ========================
+PRICE_NUMBER_FORMAT = "#,##0"
+DATE_NUMBER_FORMAT = "yyyy-mm-dd"
+EXPORT_CHUNK_ROWS = 50000    # rows converted and written at a time
+EXCEL_CHUNK_ROWS = 5000      # Excel writes cell by cell; report progress more often
+
+# Column dtypes for typed (Parquet/Feather) files; columns a frame lacks are skipped
+EXPORT_DTYPES = {
+    "Title": "string",
+    "Price": "float64",
+    "Currency": "category",
+    "Location": "string",
+    "Size (sqm)": "float64",
+    "Link": "string",
+    "Source": "string",
+    "Listing ID": "string",
+    "Bedrooms": "Int64",
+    "Posted": "datetime64[ms]",
+    "Description": "string"
+}
+
+def export_frame(df):
+    """The frame with one well-defined dtype per column, as typed files should store it"""
+    dtypes = {column: dtype for column, dtype in EXPORT_DTYPES.items() if column in df.columns}
+    return df.astype(dtypes)
+
+class ExportCancelled(Exception):
+    """Raised by export_listings() when its cancel event is set; the partial file is removed"""
+
+def _chunks(df, progress, size=EXPORT_CHUNK_ROWS):
+    """Consecutive row slices; ``progress(rows_done)`` runs once each slice has been written"""
+    for start in range(0, max(len(df), 1), size):
+        yield df.iloc[start:start + size]
+        progress(min(start + size, len(df)))
+
+def _write_csv(df, filename, progress):
+    with open(filename, "w", encoding="utf-8", newline="") as f:
+        for number, chunk in enumerate(_chunks(df, progress)):
+            chunk.to_csv(f, header=(number == 0), index=False)
+
+def _write_jsonl(df, filename, progress):
+    with open(filename, "w", encoding="utf-8") as f:
+        for chunk in _chunks(df, progress):
+            if not chunk.empty:
+                f.write(chunk.to_json(orient="records", lines=True, date_format="iso", force_ascii=False))
+                f.write("\n")
+
+def _write_json(df, filename, progress):
+    # One indented array, as DataFrame.to_json(indent=2) writes it, built a chunk at a time
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for number, chunk in enumerate(_chunks(df, progress)):
+            if not chunk.empty:
+                if number:
+                    f.write(",\n")
+                f.write(chunk.to_json(orient='records', indent=2, date_format='iso')[2:-2])
+        f.write("\n]")
+
+def _arrow_batches(df, progress):
+    """Arrow schema of the export frame, and a generator converting it chunk by chunk"""
+    import pyarrow
+
+    typed = export_frame(df)
+    schema = pyarrow.Schema.from_pandas(typed.iloc[:0], preserve_index=False)
+    batches = (pyarrow.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+               for chunk in _chunks(typed, progress) if not chunk.empty)
+    return schema, batches
+
+def _write_parquet(df, filename, progress):
+    if not is_installed("pyarrow"):
+        export_frame(df).to_parquet(filename, index=False)
+        progress(len(df))
+        return
+    import pyarrow.parquet
+
+    schema, batches = _arrow_batches(df, progress)
+    # One row group per chunk, so only one chunk is ever held in Arrow form
+    with pyarrow.parquet.ParquetWriter(filename, schema) as writer:
+        for table in batches:
+            writer.write_table(table)
+
+def _write_feather(df, filename, progress):
+    if not is_installed("pyarrow"):
+        raise ImportError("Feather export needs pyarrow")
+    import pyarrow
+
+    # Feather v2 is the Arrow IPC file format
+    schema, batches = _arrow_batches(df, progress)
+    with pyarrow.ipc.new_file(filename, schema) as writer:
+        for table in batches:
+            writer.write_table(table)
+
+def _excel_rows(chunk):
+    """Rows of plain Python values for a spreadsheet: numbers, datetimes, strings or None"""
+    columns = []
+    for column in chunk.columns:
+        values = chunk[column]
+        # Plain comprehensions: Series.map would turn the None for missing cells back into NaN
+        if pd.api.types.is_datetime64_any_dtype(values) or pd.api.types.is_numeric_dtype(values):
+            columns.append([None if pd.isna(v) else v for v in values.astype(object).tolist()])
+        else:
+            columns.append([None if pd.isna(v) else str(v) for v in values.tolist()])
+    return zip(*columns)
+
+def _write_xlsx(df, filename, progress):
+    # Rows go out in order and are flushed as written, so memory does not grow with the sheet
+    number_formats = {df.columns.get_loc(column): number_format
+                      for column, number_format in (("Price", PRICE_NUMBER_FORMAT), ("Posted", DATE_NUMBER_FORMAT))
+                      if column in df.columns}
+    if is_installed("xlsxwriter"):
+        import xlsxwriter
+
+        # Links stay plain text: a sheet holds at most 65,530 hyperlinks
+        workbook = xlsxwriter.Workbook(filename, {"constant_memory": True, "strings_to_urls": False})
+        sheet = workbook.add_worksheet("Listings")
+        formats = {col: workbook.add_format({"num_format": number_format})
+                   for col, number_format in number_formats.items()}
+        # The typed write_* methods skip write()'s per-cell type sniffing
+        writers = []
+        for col, column in enumerate(df.columns):
+            if pd.api.types.is_datetime64_any_dtype(df[column]):
+                writers.append(sheet.write_datetime)
+            elif pd.api.types.is_numeric_dtype(df[column]):
+                writers.append(sheet.write_number)
+            else:
+                writers.append(sheet.write_string)
+            if col in formats:
+                sheet.set_column(col, col, 16)
+        sheet.write_row(0, 0, [str(column) for column in df.columns])
+        row = 1
+        for chunk in _chunks(df, progress, EXCEL_CHUNK_ROWS):
+            for values in _excel_rows(chunk):
+                for col, value in enumerate(values):
+                    if value is not None:
+                        writers[col](row, col, value, formats.get(col))
+                row += 1
+        workbook.close()
+        return
+
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Listings")
+    sheet.append([str(column) for column in df.columns])
+    for chunk in _chunks(df, progress, EXCEL_CHUNK_ROWS):
+        for values in _excel_rows(chunk):
+            cells = list(values)
+            for col, number_format in number_formats.items():
+                cells[col] = WriteOnlyCell(sheet, value=cells[col])
+                cells[col].number_format = number_format
+            sheet.append(cells)
+    workbook.save(filename)
+
+# File extension -> writer; CSV and JSON Lines are written a chunk at a time
+EXPORT_WRITERS = {
+    ".csv": _write_csv,
+    ".jsonl": _write_jsonl,
+    ".json": _write_json,
+    ".xlsx": _write_xlsx,
+    ".parquet": _write_parquet,
+    ".feather": _write_feather,
+    ".arrow": _write_feather
+}
+
+def export_listings(df, filename, on_progress=None, cancel=None):
+    """Write listings to CSV, JSON Lines, JSON, Excel, Parquet or Feather, chosen by the file extension.
+
+    ``on_progress(rows_done, total_rows)`` is called after every chunk. Setting the
+    ``cancel`` event (a threading.Event) stops the export at the next chunk.
+    """
+    writer = EXPORT_WRITERS.get(os.path.splitext(filename)[1].lower())
+    if writer is None:
+        raise ValueError(f"Unsupported file type: {os.path.basename(filename)}")
+
+    def progress(done):
+        if cancel is not None and cancel.is_set():
+            raise ExportCancelled(f"Export to {os.path.basename(filename)} cancelled")
+        if on_progress is not None:
+            on_progress(done, len(df))
+
+    try:
+        writer(df, filename, progress)
+    except ExportCancelled:
+        if os.path.exists(filename):
+            os.remove(filename)
+        raise
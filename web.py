@@ -9,296 +9,343 @@
 
 
 import sys
-import re
-import requests
-import warnings
-import time
 import os
-import pandas as pd
 import webbrowser
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
 import ctypes
-from urllib3.exceptions import InsecureRequestWarning
-
-# Disable SSL warnings
-warnings.filterwarnings("ignore", category=InsecureRequestWarning)
-
-# ========================
-# UTILITY FUNCTIONS
-# ========================
-def clean_text(text):
-    """Clean text from encoding artifacts and extra spaces"""
-    if pd.isna(text) or not isinstance(text, str):
-        return text
-    cleaned = re.sub(r'[Â©ª«¬®°±²³µ¶·¸¹º»¼½¾¿]', '', text)
-    return re.sub(r'\s+', ' ', cleaned).strip()
-
-def clean_numeric(value):
-    """Extract and clean numeric values from text"""
-    if pd.isna(value) or not isinstance(value, str):
-        return value
-    return re.sub(r'[^\d,]', '', value)
-
-def format_price(price):
-    """Format price with commas as thousand separators"""
-    try:
-        price_str = str(price)
-        if price_str.replace(',', '').isdigit():
-            return "{:,}".format(int(price_str.replace(',', '')))
-        return price_str
-    except Exception:
-        return price
-
-def safe_convert_to_float(value):
-    """Safely convert string to float, handling commas and empty values"""
-    try:
-        if isinstance(value, str):
-            value = value.replace(',', '')
-        return float(value) if value else 0.0
-    except (ValueError, TypeError):
-        return 0.0
-
-# ========================
-# SCRAPING FUNCTIONS
-# ========================
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36"
-}
-
-def scrape_jiji(max_pages):
-    data = []
-    base_url = "https://jiji.com.et/api_web/v1/listing"
-    
-    for page in range(1, max_pages + 1):
-        try:
-            response = requests.get(
-                base_url,
-                params={
-                    "slug": "houses-apartments-for-sale",
-                    "webp": "true",
-                    "filter_attr_188_property_type": "House",
-                    "page": page
-                },
-                headers=HEADERS,
-                timeout=10
-            )
-            json_data = response.json()
-            
-            for listing in json_data.get("adverts_list", {}).get("adverts", []):
-                size_value = next((attr["value"] for attr in listing.get("attrs", []) 
-                                if attr.get("name") == "Property size"), "0")
-                price = clean_numeric(str(listing.get("price_obj", {}).get("value", "N/A")))
-                entry = {
-                    "Title": clean_text(listing.get("title", "N/A")),
-                    "Price": f"ETB {format_price(price)}",
-                    "Location": clean_text(listing.get("region_name", "N/A")),
-                    "Size (sqm)": safe_convert_to_float(clean_numeric(size_value)),
-                    "Link": f"https://jiji.com.et{listing.get('url', '')}",
-                    "Source": "Jiji"
-                }
-                data.append(entry)
-        except Exception:
-            continue
-    
-    df = pd.DataFrame(data)
-    if not df.empty:
-        df = df.sort_values(by=["Location", "Size (sqm)"])
-    return df
-
-def scrape_realethio(max_pages):
-    data = []
-    base_url = "https://realethio.com/property-type/house-for-sale/"
-    
-    for page in range(1, max_pages + 1):
-        try:
-            page_url = f"{base_url}page/{page}/" if page > 1 else base_url
-            response = requests.get(page_url, headers=HEADERS, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            property_cards = soup.select(".item-listing-wrap")
-
-            for card in property_cards:
-                try:
-                    size_element = card.select_one("li:contains('m²')")
-                    size_text = size_element.text.split('m²')[0] if size_element else "0"
-                    price = clean_numeric(card.select_one(".item-price").text.replace('ETB', ''))
-                    entry = {
-                        "Title": clean_text(card.select_one(".item-title").text),
-                        "Price": f"ETB {format_price(price)}",
-                        "Location": clean_text(card.select_one(".item-address").text),
-                        "Size (sqm)": safe_convert_to_float(clean_numeric(size_text)),
-                        "Link": card.select_one(".item-title a")['href'],
-                        "Source": "Realethio"
-                    }
-                    data.append(entry)
-                except Exception:
-                    continue
-        except Exception:
-            continue
-    
-    df = pd.DataFrame(data)
-    if not df.empty:
-        df = df.sort_values(by="Size (sqm)")
-    return df
-
-def scrape_ethiopiarealty(max_pages):
-    data = []
-    BASE_URL = "https://ethiopiarealty.com"
-    
-    try:
-        main_page = requests.get(f"{BASE_URL}/building-for-sale/", headers=HEADERS)
-        soup = BeautifulSoup(main_page.content, 'html.parser')
-        page_links = [urljoin(BASE_URL, a['href']) 
-                     for a in soup.select('.pagination a.page-link') 
-                     if 'href' in a.attrs][:max_pages] or [f"{BASE_URL}/building-for-sale/"]
-    except Exception:
-        page_links = [f"{BASE_URL}/building-for-sale/"]
-
-    for page_url in page_links:
-        try:
-            soup = BeautifulSoup(requests.get(page_url, headers=HEADERS).content, 'html.parser')
-            for listing in soup.select('div.d-flex.align-items-center.h-100'):
-                try:
-                    size_element = listing.select_one(".hz-figure")
-                    size_text = size_element.text if size_element else "0"
-                    price = clean_numeric(listing.select_one(".item-price").text)
-                    entry = {
-                        "Title": clean_text(listing.select_one(".item-title").text),
-                        "Price": f"ETB {format_price(price)}",
-                        "Location": clean_text(listing.select_one(".item-address").text.replace(" ,", ",")),
-                        "Size (sqm)": safe_convert_to_float(clean_numeric(size_text)),
-                        "Link": listing.select_one(".item-title a")['href'],
-                        "Source": "EthiopiaRealty"
-                    }
-                    data.append(entry)
-                except Exception:
-                    continue
-        except Exception:
-            continue
-
-    df = pd.DataFrame(data)
-    if not df.empty:
-        df = df.sort_values(by="Size (sqm)")
-    return df
-
-def scrape_livingethio(max_pages):
-    data = []
-    base_url = "https://18.223.203.43.nip.io/api/properties/findByCategoryPagination/house-for-sale"
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "Accept": "application/json",
-        "Referer": "https://livingethio.com/"
-    }
-
-    page = 1
-    total_pages = 1
-
-    while page <= min(total_pages, max_pages):
-        try:
-            response = requests.get(
-                base_url,
-                params={"page": page, "limit": 100},
-                headers=headers,
-                verify=False,
-                timeout=15
-            )
-
-            if response.status_code != 200:
-                print(f"Stopped at page {page}. Status code: {response.status_code}")
-                break
-
-            json_data = response.json()
-            total_pages = json_data.get('totalPages', 1)
-            records = json_data.get('records', [])
-            
-            if not records:
-                break
-
-            for prop in records:
-                if not prop.get('area'):
-                    continue
-                
-                price_value = prop.get('price', 'N/A')
-                if price_value != 'N/A':
-                    cleaned_price = clean_numeric(str(price_value))
-                    formatted_price = format_price(cleaned_price)
-                else:
-                    formatted_price = 'N/A'
-                
-                entry = {
-                    "Title": clean_text(prop.get('title', 'N/A')),
-                    "Price": f"Br. {formatted_price}",
-                    "Location": clean_text(prop.get('location', {}).get('name', 'N/A')),
-                    "Size (sqm)": safe_convert_to_float(prop.get('area', 0)),
-                    "Link": f"https://livingethio.com/site/property-details/{prop.get('id', '')}",
-                    "Source": "Living Ethio"
-                }
-                data.append(entry)
-            
-            page += 1
-            time.sleep(1)  # Respectful delay
-
-        except Exception as e:
-            print(f"Error occurred: {str(e)}")
-            break
-
-    df = pd.DataFrame(data)
-    if not df.empty:
-        df = df.sort_values(by=['Location', 'Size (sqm)'])
-    return df
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from scrapers import *  # scraping layer shared with the headless CLI
+from scrapers import pd, np  # loaded lazily, on the first DataFrame
 
 # ========================
 # PY_SIDE6 GUI APPLICATION
 # ========================
-from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QTableWidget, QTableWidgetItem,
+from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QTableView,
                                QDockWidget, QProgressBar, QPushButton, QLineEdit, QLabel,
                                QFileDialog, QMessageBox, QStyleFactory, QVBoxLayout,
-                               QHBoxLayout, QFrame, QHeaderView)
-from PySide6.QtCore import Qt, QThread, Signal
+                               QHBoxLayout, QFrame, QHeaderView, QCheckBox, QTableWidget, QTableWidgetItem)
+from PySide6.QtCore import Qt, QThread, Signal, QAbstractTableModel, QModelIndex, QTimer
 from PySide6.QtGui import QIcon, QBrush, QColor
 
+# Table model that reads straight from the DataFrame's columns; the view only asks for visible rows.
+# Sorting and filtering only reorder an array of row positions; the columns are never rebuilt for them.
+class DataFrameModel(QAbstractTableModel):
+    COLUMNS = ["Title", "Price", "Location", "Size (sqm)", "Source", "Link"]
+    LINK_COLUMN = 5
+
+    PRICE_COLUMN = 1
+    # Streamed pages indexed one by one before they are merged into the main search index
+    INDEX_TAIL_PAGES = 20
+
+    def __init__(self, df=None):
+        super().__init__()
+        self._df = self._conform(pd.DataFrame())
+        self._refresh_columns()
+        self._order = np.arange(0)
+        self._filter = ("", {})
+        # Search indexes are built off the GUI thread, so the first keystroke finds one ready.
+        # Streamed pages get a small index each (the tail) until a merged one is built.
+        self._index_builder = ThreadPoolExecutor(max_workers=1)
+        self._index = None
+        self._indexed = 0
+        self._tail = []
+        self._merge = None
+        self._mask = None
+        self._rows = self._order
+        self._link_brush = QBrush(QColor("white"))
+        if df is not None:
+            self.set_frame(df)
+
+    def _conform(self, df, keep=()):
+        # Detail columns are shown after Link once a run has been enriched
+        details = [c for c in DETAIL_COLUMNS if c in df.columns or c in keep]
+        return df.reindex(columns=self.COLUMNS + details + ["Currency"]).reset_index(drop=True)
+
+    def _refresh_columns(self):
+        self.columns = [c for c in self._df.columns if c != "Currency"]
+        self._columns = []
+        for c in self.columns:
+            column = self._df[c]
+            if pd.api.types.is_datetime64_any_dtype(column):
+                column = column.dt.strftime("%Y-%m-%d")
+            self._columns.append(column.to_numpy())
+        self._currencies = self._df["Currency"].to_numpy()
+
+    def _refresh_rows(self):
+        self._rows = self._order if self._mask is None else self._order[self._mask[self._order]]
+
+    def _match(self):
+        text, ranges = self._filter
+        if not text.strip() and all(bounds == (None, None) for bounds in ranges.values()):
+            return None
+        if self._merge is not None and self._merge.done():
+            # The merged index replaces the main index and the tail pages it covers
+            self._index, self._indexed = self._merge, self._merge_rows
+            self._tail = [(start, index) for start, index in self._tail if start >= self._indexed]
+            self._merge = None
+        masks = [] if self._index is None else [self._index.result().match(text, ranges)]
+        masks += [index.match(text, ranges) for _, index in self._tail]
+        return np.concatenate(masks) if masks else np.zeros(0, dtype=bool)
+
+    def set_frame(self, df):
+        self.beginResetModel()
+        self._df = self._conform(df)
+        self._refresh_columns()
+        self._order = np.arange(len(self._df))
+        self._index = self._index_builder.submit(ListingIndex, self._df) if len(self._df) else None
+        self._indexed = len(self._df)
+        self._tail = []
+        self._merge = None
+        self._mask = self._match()
+        self._refresh_rows()
+        self.endResetModel()
+
+    def append_frame(self, df):
+        if df.empty:
+            return
+        start = len(self._df)
+        added = self._conform(df, keep=self._df.columns)
+        positions = np.arange(start, start + len(added))
+        # A page is small enough to index right here; only its rows need matching
+        index = ListingIndex(added)
+        self._tail.append((start, index))
+        if self._mask is not None:
+            text, ranges = self._filter
+            matched = index.match(text, ranges)
+            self._mask = np.concatenate([self._mask, matched])
+            visible = positions[matched]
+        else:
+            visible = positions
+        if len(visible):
+            self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(visible) - 1)
+        self._df = pd.concat([self._df, added], ignore_index=True)
+        self._refresh_columns()
+        self._order = np.concatenate([self._order, positions])
+        self._refresh_rows()
+        if len(visible):
+            self.endInsertRows()
+        if len(self._tail) >= self.INDEX_TAIL_PAGES and self._merge is None:
+            # Fold the tail into one index in the background; the tail answers queries meanwhile
+            self._merge = self._index_builder.submit(ListingIndex, self._df)
+            self._merge_rows = len(self._df)
+
+    def set_filter(self, text="", ranges=None):
+        """Show only rows holding every word of ``text`` and inside every (low, high) column range"""
+        self.beginResetModel()
+        self._filter = (text, dict(ranges or {}))
+        self._mask = self._match()
+        self._refresh_rows()
+        self.endResetModel()
+
+    def filtered_rows(self):
+        """Frame positions of the rows the filter lets through, or None when nothing is filtered"""
+        return None if self._mask is None else np.flatnonzero(self._mask)
+
+    def total_rows(self):
+        return len(self._df)
+
+    def frame(self):
+        return self._df
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = index.column()
+        row = self._rows[index.row()]
+        value = self._columns[column][row]
+        if column == self.LINK_COLUMN:
+            # Show "Go to"; the actual URL is the cell's user data.
+            if role == Qt.DisplayRole:
+                return "Go to"
+            if role == Qt.UserRole:
+                return "" if pd.isna(value) else str(value)
+            if role == Qt.ForegroundRole:
+                return self._link_brush
+            return None
+        if role == Qt.DisplayRole:
+            if column == self.PRICE_COLUMN:
+                # Prices are numbers in the frame; format them only for display
+                return format_listing_price(value, self._currencies[row])
+            return "" if pd.isna(value) else str(value)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.columns[section]
+        return str(section + 1)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # Column -1 means "no sort column"; keep the order the rows arrived in
+        if not 0 <= column < len(self.columns):
+            return
+        self.layoutAboutToBeChanged.emit()
+        # Stable over the current order, so rows that tie keep the previous sort
+        values = self._df[self.columns[column]].take(self._order)
+        self._order = values.sort_values(ascending=(order == Qt.AscendingOrder), kind="stable",
+                                         na_position="last").index.to_numpy()
+        self._refresh_rows()
+        self.layoutChanged.emit()
+
 # QThread subclass for background scraping
 class ScraperThread(QThread):
     update_progress = Signal(int, str)
-    scraping_complete = Signal(pd.DataFrame)
+    scraping_complete = Signal(object)
+    partial_results = Signal(object)
+    pages_skipped = Signal(object)
     error_occurred = Signal(str)
 
-    def __init__(self, sites_pages):
+    def __init__(self, sites_pages, max_workers=DEFAULT_MAX_WORKERS, incremental=False, enrich=False, save=False):
         super().__init__()
         self.sites_pages = sites_pages
+        self.max_workers = max_workers
+        self.incremental = incremental
+        self.enrich = enrich
+        self.save = save
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """Stop at the next page; the listings fetched so far are still returned"""
+        self.cancel_event.set()
 
     def run(self):
         try:
             all_data = []
-            total = len([p for p in self.sites_pages.values() if p > 0])
-            completed = 0
-            
-            # Iterate over each site. The keys here should match the scraper function names.
-            for site, pages in self.sites_pages.items():
-                if pages > 0:
-                    try:
-                        scraper_func = globals().get(f"scrape_{site}")
-                        if scraper_func is None:
-                            self.error_occurred.emit(f"No scraper found for {site}")
-                            continue
-                        df = scraper_func(pages)
-                        if not df.empty:
-                            all_data.append(df)
-                        completed += 1
-                        self.update_progress.emit(int((completed/total)*100), f"Scraping {site}...")
-                    except Exception as e:
-                        self.error_occurred.emit(f"{site} error: {str(e)}")
+            skipped = []
+            # Fingerprints of the pages read, stored as seen only once the run has completed
+            seen = []
+            # Progress counts pages against the total page budget; a site that finishes early,
+            # stops or fails counts as all of its pages
+            budget = {site: pages for site, pages in self.sites_pages.items() if pages > 0}
+            total = sum(budget.values()) or 1
+            done = dict.fromkeys(budget, 0)
+            lock = threading.Lock()
+
+            def advance(site, pages=1):
+                # Called from the site workers as pages are parsed or skipped
+                with lock:
+                    done[site] = min(budget[site], done[site] + pages)
+                    return done[site], int(sum(done.values()) / total * 100)
+
+            def on_page(site, page_df):
+                self.partial_results.emit(page_df)
+                count, percent = advance(site)
+                self.update_progress.emit(percent, f"{site}: page {count} of {budget[site]}")
+
+            def on_skip(site, page, url, reason):
+                skipped.append((site, page, url, reason))
+                count, percent = advance(site)
+                self.update_progress.emit(percent, f"{site}: page {page} skipped")
+
+            # Each site runs in its own worker; report every site as soon as it finishes.
+            # Pages stream into the table as they are parsed.
+            for site, df, error in iter_site_results(self.sites_pages, self.max_workers, self.incremental,
+                                                     on_page=on_page, on_skip=on_skip, cancel=self.cancel_event,
+                                                     seen=seen):
+                site_skips = sum(1 for skip in skipped if skip[0] == site)
+                if error:
+                    self.error_occurred.emit(f"{site} error: {error}")
+                    message = f"{site} failed"
+                else:
+                    if not df.empty:
+                        all_data.append(df)
+                    message = f"{site} done ({len(df)} listings)"
+                    if site_skips:
+                        message = f"{site} done ({len(df)} listings, {site_skips} pages skipped)"
+                _, percent = advance(site, budget.get(site, 0))
+                self.update_progress.emit(percent, message)
+
+            if skipped:
+                self.pages_skipped.emit(skipped)
             
+            # Combine only once every worker has finished
             if all_data:
                 final_df = pd.concat(all_data).reset_index(drop=True)
+                # Tag copies of the same property found on several sites
+                final_df = dedupe_listings(final_df)
+                duplicates = len(final_df) - final_df["Listing ID"].nunique()
+                if duplicates:
+                    self.update_progress.emit(100, f"{duplicates} listings are duplicates from another site")
+                if self.enrich and not self.cancel_event.is_set():
+                    # Detail pages are a second stage, still on this thread
+                    final_df = enrich_listings(final_df, cancel=self.cancel_event,
+                                               on_progress=lambda done, count: self.update_progress.emit(
+                                                   int(done / count * 100), f"Fetching listing details {done}/{count}"))
+                if self.save:
+                    changed = listing_store.upsert(final_df)
+                    self.update_progress.emit(100, f"Saved to store ({changed} new or changed)")
+                if self.cancel_event.is_set():
+                    self.update_progress.emit(100, f"Stopped with {len(final_df)} listings")
                 self.scraping_complete.emit(final_df)
             else:
                 self.scraping_complete.emit(pd.DataFrame())
+            seen_listings.remember(seen)
         except Exception as e:
             self.error_occurred.emit(f"Thread error: {str(e)}")
 
+# Writes an export file off the GUI thread, chunk by chunk, so it can report progress and stop early
+class ExportThread(QThread):
+    progress = Signal(int)
+    export_complete = Signal(str)
+    export_cancelled = Signal(str)
+    error_occurred = Signal(str)
+
+    def __init__(self, df, filename):
+        super().__init__()
+        self.df = df
+        self.filename = filename
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            export_listings(self.df, self.filename, cancel=self.cancel_event,
+                            on_progress=lambda done, total: self.progress.emit(int(done / max(total, 1) * 100)))
+            self.export_complete.emit(self.filename)
+        except ExportCancelled:
+            self.export_cancelled.emit(self.filename)
+        except Exception as e:
+            self.error_occurred.emit(f"Export failed: {str(e)}")
+
+# Reads the listing store off the GUI thread; it can hold far more rows than one run
+class StoreLoaderThread(QThread):
+    loaded = Signal(object)
+    error_occurred = Signal(str)
+
+    def run(self):
+        try:
+            self.loaded.emit(listing_store.load())
+        except Exception as e:
+            self.error_occurred.emit(f"Could not read the listing store: {str(e)}")
+
+def _ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:,.0f}"
+
 class RealEstateApp(QMainWindow):
+    # Stats panel column -> text from one site's metrics.summary() entry
+    STATS_COLUMNS = [
+        ("Requests", lambda s: f"{s['requests']:,}"),
+        ("Errors", lambda s: f"{s['errors']:,}"),
+        ("Status codes", lambda s: ", ".join(f"{status}×{count}" for status, count in s["statuses"].items())),
+        ("Latency p50 / p95 (ms)", lambda s: f"{_ms(s['latency_p50'])} / {_ms(s['latency_p95'])}"),
+        ("Downloaded", lambda s: f"{s['bytes'] / 1e6:,.2f} MB"),
+        ("Cache hits", lambda s: f"{s['cache_hits']:,}"),
+        ("Pages", lambda s: f"{s['pages']:,}"),
+        ("Skipped", lambda s: f"{s['skipped']:,}"),
+        ("Parse p50 / p95 (ms)", lambda s: f"{_ms(s['parse_p50'])} / {_ms(s['parse_p95'])}"),
+        ("Parse total (s)", lambda s: f"{s['parse_seconds']:,.2f}"),
+        ("Rows", lambda s: f"{s['rows']:,}")
+    ]
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Real Estate Scraper Pro")
@@ -307,6 +354,7 @@ class RealEstateApp(QMainWindow):
         if os.path.exists(icon_path):
             self.setWindowIcon(QIcon(icon_path))
         self.current_df = pd.DataFrame()
+        self.export_thread = None
         self.init_ui()
 
     def init_ui(self):
@@ -320,107 +368,287 @@ class RealEstateApp(QMainWindow):
         self.start_btn = QPushButton("▶ Start Scraping")
         self.start_btn.clicked.connect(self.start_scraping)
         control_layout.addWidget(self.start_btn)
+        self.stop_btn = QPushButton("⏹ Stop")
+        self.stop_btn.setToolTip("Stop after the current pages and keep what was fetched")
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop_scraping)
+        control_layout.addWidget(self.stop_btn)
+        self.incremental_checkbox = QCheckBox("Only new listings")
+        self.incremental_checkbox.setToolTip("Stop paging once a page holds only listings seen in earlier runs")
+        control_layout.addWidget(self.incremental_checkbox)
+        self.details_checkbox = QCheckBox("Fetch listing details")
+        self.details_checkbox.setToolTip("Open every listing's page for bedrooms, posting date and description")
+        control_layout.addWidget(self.details_checkbox)
+        self.hide_duplicates_checkbox = QCheckBox("Hide cross-site duplicates")
+        self.hide_duplicates_checkbox.setToolTip("Show one row for a property listed on several sites")
+        self.hide_duplicates_checkbox.toggled.connect(self.show_current)
+        control_layout.addWidget(self.hide_duplicates_checkbox)
+        self.save_checkbox = QCheckBox("Save to local store")
+        self.save_checkbox.setToolTip("Keep every run's listings, and their price history, on disk")
+        self.save_checkbox.setChecked(True)
+        control_layout.addWidget(self.save_checkbox)
         layout.addLayout(control_layout)
 
         # Progress bar
         self.progress = QProgressBar()
         layout.addWidget(self.progress)
 
+        # Export progress lives in the status bar, so it can run alongside a scrape
+        self.export_progress = QProgressBar()
+        self.export_progress.setMaximumWidth(200)
+        self.export_progress.setFormat("Export %p%")
+        self.export_progress.hide()
+        self.statusBar().addPermanentWidget(self.export_progress)
+
+        # Filter bar over the results; every keystroke is answered from the model's search index
+        filter_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("🔍 Search title or location")
+        self.search_input.setClearButtonEnabled(True)
+        filter_layout.addWidget(self.search_input, 3)
+        self.range_inputs = {}
+        for column, label, unit in [("Size (sqm)", "Size", "sqm"), ("Price", "Price", "e.g. 10M")]:
+            filter_layout.addWidget(QLabel(f"{label}:"))
+            bounds = []
+            for placeholder in ("Min", "Max"):
+                entry = QLineEdit()
+                entry.setPlaceholderText(f"{placeholder} ({unit})")
+                entry.setMaximumWidth(110)
+                filter_layout.addWidget(entry)
+                bounds.append(entry)
+            self.range_inputs[column] = bounds
+        self.clear_filter_btn = QPushButton("✖ Clear")
+        self.clear_filter_btn.clicked.connect(self.clear_filter)
+        filter_layout.addWidget(self.clear_filter_btn)
+        self.filter_count = QLabel()
+        filter_layout.addWidget(self.filter_count)
+        layout.addLayout(filter_layout)
+        for entry in [self.search_input] + [e for bounds in self.range_inputs.values() for e in bounds]:
+            entry.textChanged.connect(self.apply_filter)
+
         # Table to display results (including link column)
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["Title", "Price", "Location", "Size (sqm)", "Source", "Link"])
+        self.model = DataFrameModel()
+        for signal in (self.model.modelReset, self.model.rowsInserted):
+            signal.connect(self.update_filter_count)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSortingEnabled(True)
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        # Fixed row heights so the view never measures rows it is not showing
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(24)
         layout.addWidget(self.table)
-        self.table.cellClicked.connect(self.handle_cell_click)
+        self.table.clicked.connect(lambda index: self.handle_cell_click(index.row(), index.column()))
 
         # Sidebar for site settings
         sidebar = QDockWidget("Settings", self)
         sidebar_widget = QWidget()
         sidebar_layout = QVBoxLayout(sidebar_widget)
 
-        sites = ["Jiji", "Realethio", "EthiopiaRealty", "Living Ethio"]
+        # One page count per registered site
         self.page_inputs = {}
-        for site in sites:
+        for site in SITES:
             frame = QFrame()
             frame_layout = QVBoxLayout(frame)
-            label = QLabel(f"{site} Pages:")
+            label = QLabel(f"{SITE_DEFINITIONS[site].label} Pages:")
             entry = QLineEdit()
             entry.setPlaceholderText("Pages")
             frame_layout.addWidget(label)
             frame_layout.addWidget(entry)
             sidebar_layout.addWidget(frame)
-            # Store key in lowercase with no spaces
-            self.page_inputs[site.lower().replace(" ", "")] = entry
+            self.page_inputs[site] = entry
+
+        self.load_store_btn = QPushButton("📂 Load Stored Listings")
+        self.load_store_btn.clicked.connect(self.load_store)
+        sidebar_layout.addWidget(self.load_store_btn)
 
         self.export_btn = QPushButton("💾 Export Data")
         self.export_btn.clicked.connect(self.export_data)
         sidebar_layout.addWidget(self.export_btn)
+
+        # HTTP cache controls
+        self.cache_checkbox = QCheckBox("Use HTTP cache")
+        self.cache_checkbox.setChecked(http_cache.enabled)
+        self.cache_checkbox.toggled.connect(self.toggle_cache)
+        sidebar_layout.addWidget(self.cache_checkbox)
+
+        self.clear_cache_btn = QPushButton("🗑 Clear Cache")
+        self.clear_cache_btn.clicked.connect(self.clear_cache)
+        sidebar_layout.addWidget(self.clear_cache_btn)
         sidebar.setWidget(sidebar_widget)
         self.addDockWidget(Qt.LeftDockWidgetArea, sidebar)
 
+        # Per-site request and parse statistics of the current run
+        stats_dock = QDockWidget("Run Stats", self)
+        stats_widget = QWidget()
+        stats_layout = QVBoxLayout(stats_widget)
+        self.stats_table = QTableWidget(0, len(self.STATS_COLUMNS))
+        self.stats_table.setHorizontalHeaderLabels([label for label, _ in self.STATS_COLUMNS])
+        self.stats_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.stats_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        stats_layout.addWidget(self.stats_table)
+        self.save_metrics_btn = QPushButton("💾 Save Metrics")
+        self.save_metrics_btn.setToolTip("JSON, or Prometheus text for any other extension")
+        self.save_metrics_btn.clicked.connect(self.save_metrics)
+        stats_layout.addWidget(self.save_metrics_btn)
+        stats_dock.setWidget(stats_widget)
+        self.addDockWidget(Qt.BottomDockWidgetArea, stats_dock)
+        # Refreshed while a scrape runs; the worker threads only update counters
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(500)
+        self.stats_timer.timeout.connect(self.update_stats)
+
     def start_scraping(self):
         try:
-            pages = {
-                'jiji': int(self.page_inputs['jiji'].text() or 0),
-                'realethio': int(self.page_inputs['realethio'].text() or 0),
-                'ethiopiarealty': int(self.page_inputs['ethiopiarealty'].text() or 0),
-                'livingethio': int(self.page_inputs['livingethio'].text() or 0)
-            }
+            pages = {site: int(entry.text() or 0) for site, entry in self.page_inputs.items()}
         except ValueError:
             QMessageBox.warning(self, "Error", "Please enter valid page numbers")
             return
 
         self.start_btn.setEnabled(False)
-        self.table.setRowCount(0)
+        self.stop_btn.setEnabled(True)
+        self.progress.setValue(0)
+        self.model.set_frame(pd.DataFrame())
+        metrics.reset()
+        self.stats_timer.start()
         
-        self.thread = ScraperThread(pages)
+        self.thread = ScraperThread(pages, incremental=self.incremental_checkbox.isChecked(),
+                                    enrich=self.details_checkbox.isChecked(),
+                                    save=self.save_checkbox.isChecked())
         self.thread.update_progress.connect(self.update_progress)
+        self.thread.partial_results.connect(self.append_results)
         self.thread.scraping_complete.connect(self.display_results)
+        self.thread.pages_skipped.connect(self.show_skipped)
         self.thread.error_occurred.connect(self.show_error)
+        self.thread.finished.connect(lambda: self.stop_btn.setEnabled(False))
+        self.thread.finished.connect(self.stats_timer.stop)
+        self.thread.finished.connect(self.update_stats)
         self.thread.start()
 
+    def stop_scraping(self):
+        self.thread.cancel()
+        self.stop_btn.setEnabled(False)
+        self.statusBar().showMessage("Stopping...")
+
+    def update_stats(self):
+        summary = metrics.summary()
+        self.stats_table.setRowCount(len(summary))
+        self.stats_table.setVerticalHeaderLabels(list(summary))
+        for row, stats in enumerate(summary.values()):
+            for column, (_, text) in enumerate(self.STATS_COLUMNS):
+                self.stats_table.setItem(row, column, QTableWidgetItem(text(stats)))
+
+    def save_metrics(self):
+        filename, _ = QFileDialog.getSaveFileName(self, "Save Metrics", "",
+                                                  "JSON (*.json);;Prometheus text (*.prom)")
+        if filename:
+            try:
+                metrics.dump(filename)
+            except OSError as e:
+                QMessageBox.critical(self, "Error", f"Could not save metrics: {str(e)}")
+
     def update_progress(self, value, message):
         self.progress.setValue(value)
         self.statusBar().showMessage(message)
 
+    def append_results(self, df):
+        # Partial page from a running scrape; the final sorted result replaces these rows
+        self.model.append_frame(df)
+        self.statusBar().showMessage(f"{self.model.rowCount()} properties so far...")
+
     def display_results(self, df):
         self.start_btn.setEnabled(True)
         self.progress.setValue(0)
         
         if df.empty:
+            self.model.set_frame(pd.DataFrame())
             QMessageBox.information(self, "Info", "No properties found")
             return
             
         self.current_df = df
-        self.table.setRowCount(len(df))
-        
-        for row_idx, row in df.iterrows():
-            self.table.setItem(row_idx, 0, QTableWidgetItem(str(row.get('Title', ''))))
-            self.table.setItem(row_idx, 1, QTableWidgetItem(str(row.get('Price', ''))))
-            self.table.setItem(row_idx, 2, QTableWidgetItem(str(row.get('Location', ''))))
-            self.table.setItem(row_idx, 3, QTableWidgetItem(str(row.get('Size (sqm)', ''))))
-            self.table.setItem(row_idx, 4, QTableWidgetItem(str(row.get('Source', ''))))
-            # Create a cell with "Go to" text; store the actual URL in the cell's user data.
-            link_item = QTableWidgetItem("Go to")
-            link_item.setData(Qt.UserRole, row.get('Link', ''))
-            link_item.setForeground(QBrush(QColor("white")))
-            self.table.setItem(row_idx, 5, link_item)
+        self.show_current()
+
+    def visible_frame(self):
+        if self.hide_duplicates_checkbox.isChecked() and "Listing ID" in self.current_df.columns:
+            return drop_duplicate_listings(self.current_df)
+        return self.current_df
+
+    def show_current(self):
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.model.set_frame(self.visible_frame())
+
+    def apply_filter(self):
+        ranges = {column: (parse_amount(low.text()), parse_amount(high.text()))
+                  for column, (low, high) in self.range_inputs.items()}
+        self.model.set_filter(self.search_input.text(), ranges)
+
+    def clear_filter(self):
+        for entry in [self.search_input] + [e for bounds in self.range_inputs.values() for e in bounds]:
+            entry.blockSignals(True)
+            entry.clear()
+            entry.blockSignals(False)
+        self.apply_filter()
+
+    def update_filter_count(self):
+        shown, total = self.model.rowCount(), self.model.total_rows()
+        self.filter_count.setText(f"{shown:,} of {total:,}" if shown != total else f"{total:,} listings")
+
+    def filtered_frame(self):
+        # What the table shows, in arrival order; the filter applies to exports as well
+        df = self.visible_frame()
+        rows = self.model.filtered_rows()
+        if rows is not None and len(df) == self.model.total_rows():
+            df = df.iloc[rows].reset_index(drop=True)
+        return df
 
     def handle_cell_click(self, row, column):
         # If the "Link" column (index 5) is clicked, open the URL.
-        if column == 5:
-            item = self.table.item(row, column)
-            if item:
-                url = item.data(Qt.UserRole)
-                if url:
-                    webbrowser.open(url)
+        if column == DataFrameModel.LINK_COLUMN:
+            url = self.model.index(row, column).data(Qt.UserRole)
+            if url:
+                webbrowser.open(url)
 
     def show_error(self, message):
         self.start_btn.setEnabled(True)
         QMessageBox.critical(self, "Error", message)
 
+    def show_skipped(self, skipped):
+        # (site, page, url, reason) for every page given up on after retries
+        lines = [f"{site} page {page}: {reason}" for site, page, url, reason in skipped[:20]]
+        if len(skipped) > 20:
+            lines.append(f"... and {len(skipped) - 20} more")
+        QMessageBox.warning(self, "Pages skipped",
+                            f"{len(skipped)} page(s) could not be fetched:\n\n" + "\n".join(lines))
+
+    def load_store(self):
+        self.load_store_btn.setEnabled(False)
+        self.statusBar().showMessage("Reading the listing store...")
+        self.store_loader = StoreLoaderThread()
+        self.store_loader.loaded.connect(self.display_stored)
+        self.store_loader.error_occurred.connect(self.show_error)
+        self.store_loader.finished.connect(lambda: self.load_store_btn.setEnabled(True))
+        self.store_loader.start()
+
+    def display_stored(self, df):
+        self.display_results(df)
+        self.statusBar().showMessage(f"{len(df)} listings loaded from the store", 5000)
+
+    def toggle_cache(self, checked):
+        http_cache.enabled = checked
+
+    def clear_cache(self):
+        try:
+            http_cache.clear()
+            self.statusBar().showMessage("HTTP cache cleared", 5000)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Could not clear cache: {str(e)}")
+
     def export_data(self):
+        # While an export runs, the button cancels it
+        if self.export_thread is not None and self.export_thread.isRunning():
+            self.export_thread.cancel()
+            self.export_btn.setEnabled(False)
+            return
         if self.current_df.empty:
             QMessageBox.warning(self, "Warning", "No data to export")
             return
@@ -429,23 +657,30 @@ class RealEstateApp(QMainWindow):
             self,
             "Save Data",
             "",
-            "CSV (*.csv);;Excel (*.xlsx);;JSON (*.json)"
+            "CSV (*.csv);;Excel (*.xlsx);;JSON (*.json);;JSON Lines (*.jsonl);;Parquet (*.parquet);;Feather (*.feather)"
         )
         
         if filename:
-            try:
-                if filename.endswith('.csv'):
-                    self.current_df.to_csv(filename, index=False)
-                elif filename.endswith('.xlsx'):
-                    self.current_df.to_excel(filename, index=False)
-                elif filename.endswith('.json'):
-                    self.current_df.to_json(filename, orient='records', indent=2)
-                
-                QMessageBox.information(self, "Success", f"Data saved to:\n{filename}")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Export failed: {str(e)}")
-
-if __name__ == "__main__":
+            self.export_thread = ExportThread(self.filtered_frame(), filename)
+            self.export_thread.progress.connect(self.export_progress.setValue)
+            self.export_thread.export_complete.connect(
+                lambda name: QMessageBox.information(self, "Success", f"Data saved to:\n{name}"))
+            self.export_thread.export_cancelled.connect(
+                lambda name: self.statusBar().showMessage("Export cancelled", 5000))
+            self.export_thread.error_occurred.connect(lambda message: QMessageBox.critical(self, "Error", message))
+            self.export_thread.finished.connect(self.export_finished)
+            self.export_progress.setValue(0)
+            self.export_progress.show()
+            self.export_btn.setText("✖ Cancel Export")
+            self.export_thread.start()
+
+    def export_finished(self):
+        self.export_progress.hide()
+        self.export_btn.setText("💾 Export Data")
+        self.export_btn.setEnabled(True)
+
+def main():
+    """Launch the desktop application"""
     app = QApplication(sys.argv)
     app.setStyle(QStyleFactory.create("Fusion"))
     # Set the application-wide icon
@@ -454,7 +689,10 @@ if __name__ == "__main__":
         app.setWindowIcon(QIcon(icon_path))
     window = RealEstateApp()
     window.show()
-    sys.exit(app.exec())
+    return app.exec()
+
+if __name__ == "__main__":
+    sys.exit(main())
 
 
 # In[ ]: